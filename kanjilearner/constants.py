@@ -34,4 +34,56 @@ SRS_INTERVALS = {
     SRSStage.MASTER: timedelta(days=30),
     SRSStage.ENLIGHTENED: timedelta(days=120),
     # SRSStage.BURNED: no interval – final stage
-}
\ No newline at end of file
+}
+
+# Stage after a correct answer; BURNED is final
+SRS_PROMOTIONS = {
+    SRSStage.LOCKED: SRSStage.LESSON,
+    SRSStage.LESSON: SRSStage.APPRENTICE_1,
+    SRSStage.APPRENTICE_1: SRSStage.APPRENTICE_2,
+    SRSStage.APPRENTICE_2: SRSStage.APPRENTICE_3,
+    SRSStage.APPRENTICE_3: SRSStage.APPRENTICE_4,
+    SRSStage.APPRENTICE_4: SRSStage.GURU_1,
+    SRSStage.GURU_1: SRSStage.GURU_2,
+    SRSStage.GURU_2: SRSStage.MASTER,
+    SRSStage.MASTER: SRSStage.ENLIGHTENED,
+    SRSStage.ENLIGHTENED: SRSStage.BURNED,
+}
+
+# Stage after a wrong answer; LOCKED, LESSON and BURNED items aren't demoted
+SRS_DEMOTIONS = {
+    SRSStage.APPRENTICE_1: SRSStage.APPRENTICE_1,
+    SRSStage.APPRENTICE_2: SRSStage.APPRENTICE_1,
+    SRSStage.APPRENTICE_3: SRSStage.APPRENTICE_1,
+    SRSStage.APPRENTICE_4: SRSStage.APPRENTICE_1,
+    SRSStage.GURU_1: SRSStage.APPRENTICE_4,
+    SRSStage.GURU_2: SRSStage.APPRENTICE_4,
+    SRSStage.MASTER: SRSStage.GURU_1,
+    SRSStage.ENLIGHTENED: SRSStage.GURU_1,
+}
+
+# Stages that never show up in reviews; the due-review partial index on
+# UserDictionaryEntry excludes them, so review queries must exclude them too
+NOT_IN_REVIEWS = [SRSStage.LOCKED, SRSStage.LESSON]
+
+# Stage after a correct answer (reviews, and finishing a lesson: LESSON → A1).
+# LOCKED items only move on through unlock(). Wrong answers use SRS_DEMOTIONS,
+# which only covers review stages already.
+REVIEW_PROMOTIONS = {old: new for old, new in SRS_PROMOTIONS.items() if old != SRSStage.LOCKED}
+
+# Dashboard groups of SRS stages (item spread); LOCKED and LESSON items aren't counted
+STAGE_GROUPS = {
+    "apprentice": {
+        SRSStage.APPRENTICE_1,
+        SRSStage.APPRENTICE_2,
+        SRSStage.APPRENTICE_3,
+        SRSStage.APPRENTICE_4,
+    },
+    "guru": {
+        SRSStage.GURU_1,
+        SRSStage.GURU_2,
+    },
+    "master": {SRSStage.MASTER},
+    "enlightened": {SRSStage.ENLIGHTENED},
+    "burned": {SRSStage.BURNED},
+}
@@ -0,0 +1,50 @@
+import gzip
+import json
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from kanjilearner.models import ReviewEvent
+
+ARCHIVE_FIELDS = ("id", "user_id", "entry_id", "timestamp", "correct", "stage_before", "stage_after", "latency_ms")
+
+
+class Command(BaseCommand):
+    help = (
+        "Move review events older than --before into a gzipped JSON-lines file, "
+        "then delete them, one batch (and transaction) at a time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="YYYY-MM-DD; events before this day are archived")
+        parser.add_argument("--output", required=True, help="archive file (.jsonl.gz); appended to if it exists")
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            day = datetime.strptime(options["before"], "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError("--before must be a date like 2026-01-01")
+        cutoff = timezone.make_aware(datetime.combine(day, time.min))
+
+        archived = 0
+        with gzip.open(options["output"], "at", encoding="utf-8") as out:
+            while True:
+                with transaction.atomic():
+                    # Oldest first: the BRIN index on timestamp keeps this a short range scan
+                    rows = list(
+                        ReviewEvent.objects
+                        .filter(timestamp__lt=cutoff)
+                        .order_by("timestamp", "id")
+                        .values(*ARCHIVE_FIELDS)[:options["batch_size"]]
+                    )
+                    if not rows:
+                        break
+                    for row in rows:
+                        row["timestamp"] = row["timestamp"].isoformat()
+                        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    ReviewEvent.objects.filter(id__in=[row["id"] for row in rows]).delete()
+                archived += len(rows)
+
+        self.stdout.write(f"Archived {archived} review events from before {day} to {options['output']}")
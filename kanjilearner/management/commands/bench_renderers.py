@@ -0,0 +1,164 @@
+import json
+import timeit
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from kanjilearner.constants import SRSStage
+from kanjilearner.models import DictionaryEntry, UserDictionaryEntry
+from kanjilearner.renderers import FastJSONRenderer, MessagePackRenderer, PrerenderedJSONRenderer
+from kanjilearner.serializers import UserDictionaryEntrySerializer
+from kanjilearner.services.catalog import ENTRY_FIELDS, RELATION_FIELDS, Catalog
+
+REVIEW_STAGES = [
+    SRSStage.APPRENTICE_1,
+    SRSStage.APPRENTICE_2,
+    SRSStage.APPRENTICE_3,
+    SRSStage.APPRENTICE_4,
+    SRSStage.GURU_1,
+    SRSStage.GURU_2,
+    SRSStage.MASTER,
+    SRSStage.ENLIGHTENED,
+]
+
+RENDERERS = [
+    ("JSONRenderer (stock DRF)", JSONRenderer, "application/json"),
+    ("PrerenderedJSONRenderer (default)", PrerenderedJSONRenderer, "application/json"),
+    ("FastJSONRenderer", FastJSONRenderer, "application/json"),
+    ("MessagePackRenderer", MessagePackRenderer, "application/msgpack"),
+]
+
+
+def load_fixture(path):
+    """
+    Build a Catalog and one user's UDEs (entry id → UDE) from a dumpdata fixture,
+    without touching the database.
+    """
+    with open(path, encoding="utf-8") as f:
+        objects = json.load(f)
+
+    raw = {}
+    relations = {name: {} for name in RELATION_FIELDS}
+    ude_fields = {}
+    for obj in objects:
+        fields = obj["fields"]
+        if obj["model"] == "kanjilearner.dictionaryentry":
+            raw[obj["pk"]] = {
+                name: DictionaryEntry._meta.get_field(name).to_python(fields[name])
+                for name in ENTRY_FIELDS if name != "id"
+            }
+            for name in RELATION_FIELDS:
+                relations[name][obj["pk"]] = fields[name]
+        elif obj["model"] == "kanjilearner.userdictionaryentry" and fields["user"] == 1:
+            ude_fields[fields["entry"]] = (obj["pk"], fields)
+
+    raw = dict(sorted(raw.items(), key=lambda item: (item[1]["level"], item[0])))
+    catalog = Catalog.build(0, raw, relations, audio_url=lambda name: settings.MEDIA_URL + name)
+
+    # Entries the fixture user hasn't touched get a locked UDE, like new users
+    user_entries = {}
+    for entry_id in catalog.entries:
+        pk, fields = ude_fields.get(entry_id, (None, {}))
+        user_entries[entry_id] = UserDictionaryEntry(
+            id=pk,
+            user_id=1,
+            entry_id=entry_id,
+            srs_stage=fields.get("srs_stage", SRSStage.LOCKED),
+            unlocked_at=UserDictionaryEntry._meta.get_field("unlocked_at").to_python(fields.get("unlocked_at")),
+            next_review_at=UserDictionaryEntry._meta.get_field("next_review_at").to_python(fields.get("next_review_at")),
+        )
+    return catalog, user_entries
+
+
+def serialize(catalog, user_entries, udes):
+    context = {
+        "catalog": catalog,
+        "user_entry_map": user_entries,
+        "planned_entry_ids": set(),
+    }
+    return UserDictionaryEntrySerializer(udes, many=True, context=context).data
+
+
+def search_payload(catalog, user_entries, page_size=200):
+    """A full search page, shaped like SearchPagination's response."""
+    udes = [user_entries[entry_id] for entry_id in list(catalog.entries)[:page_size]]
+    return {
+        "count": len(catalog.entries),
+        "next": "http://testserver/api/search/?page=2&page_size=200&q=a",
+        "previous": None,
+        "results": serialize(catalog, user_entries, udes),
+    }
+
+
+def reviews_payload(catalog, user_entries, limit=100):
+    """A review batch: every entry put in a review stage, due some time in the past."""
+    now = timezone.now()
+    user_entries = dict(user_entries)
+    udes = []
+    for i, entry_id in enumerate(list(catalog.entries)[:limit]):
+        ude = UserDictionaryEntry(
+            id=user_entries[entry_id].id,
+            user_id=1,
+            entry_id=entry_id,
+            srs_stage=REVIEW_STAGES[i % len(REVIEW_STAGES)],
+            unlocked_at=user_entries[entry_id].unlocked_at or now - timedelta(days=30),
+            next_review_at=now - timedelta(minutes=i),
+        )
+        user_entries[entry_id] = ude
+        udes.append(ude)
+    return serialize(catalog, user_entries, udes)
+
+
+def forecast_payload():
+    """Same shape as get_review_forecast: 7 days × 24 hours."""
+    today = timezone.now().date()
+    result = {}
+    cumulative = 0
+    for offset in range(7):
+        day_str = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+        result[day_str] = {}
+        for hour in range(24):
+            count = (offset * 24 + hour) % 7
+            cumulative += count
+            result[day_str][f"{hour:02d}"] = {"count": count, "cumulative": cumulative}
+    return result
+
+
+class Command(BaseCommand):
+    help = "Benchmark response renderers on search / review / forecast payloads built from a fixture"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fixture",
+            default=str(settings.BASE_DIR / "kanjilearner_data.json"),
+            help="dumpdata fixture with dictionary entries and user 1's UDEs",
+        )
+        parser.add_argument("--number", type=int, default=200, help="renders per timing run")
+        parser.add_argument("--repeat", type=int, default=5, help="timing runs; the best one is reported")
+
+    def handle(self, *args, **options):
+        catalog, user_entries = load_fixture(options["fixture"])
+        payloads = [
+            ("search (200 results)", search_payload(catalog, user_entries)),
+            ("reviews (100 items)", reviews_payload(catalog, user_entries)),
+            ("review forecast (168 buckets)", forecast_payload()),
+        ]
+
+        for payload_name, data in payloads:
+            self.stdout.write(f"\n{payload_name}")
+            baseline = None
+            for renderer_name, renderer_class, media_type in RENDERERS:
+                renderer = renderer_class()
+
+                def render():
+                    return renderer.render(data, media_type, {})
+
+                size = len(render())  # also warms entry templates
+                best = min(timeit.repeat(render, number=options["number"], repeat=options["repeat"]))
+                per_render = best / options["number"] * 1e6
+                baseline = baseline or per_render
+                self.stdout.write(
+                    f"  {renderer_name:<36} {per_render:>9.1f} µs  "
+                    f"{baseline / per_render:>5.1f}x  {size:>8} bytes"
+                )
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from kanjilearner.models import UserQueueCounts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's lesson / review badge counts (UserQueueCounts) "
+        "from their UDEs, fixing any drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=int, action="append", help="only this user (repeatable)")
+
+    def handle(self, *args, **options):
+        user_ids = options["user_id"] or list(User.objects.order_by("id").values_list("id", flat=True))
+
+        rebuilt = drifted = 0
+        for user_id in user_ids:
+            old = UserQueueCounts.objects.filter(pk=user_id).values_list("lessons", "review_buckets").first()
+            new = UserQueueCounts.rebuild(user_id)
+            if old is not None and old != (new.lessons, new.review_buckets):
+                drifted += 1
+            rebuilt += 1
+
+        self.stdout.write(f"Rebuilt queue counts for {rebuilt} users ({drifted} had drifted)")
@@ -4,6 +4,7 @@ from kanjilearner.utils import initialize_user_dictionary_entries
 from kanjilearner.models import UserDictionaryEntry
 from kanjilearner.constants import EntryType, SRSStage
 from kanjilearner.models import DictionaryEntry
+from kanjilearner.services.catalog import bump_catalog_version
 from django.contrib.auth.models import User
 from django.db.models import Count
 from django.core.mail import send_mail
@@ -16,6 +17,7 @@ User = get_user_model()
 def delete_last_n_entries():
     # Delete them
     DictionaryEntry.objects.filter(id__gte=500, id__lte=570).delete()
+    bump_catalog_version()
 
 
 def insert_radicals():
@@ -58,6 +60,7 @@ def insert_radicals():
     ]
 
     DictionaryEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    bump_catalog_version()  # bulk_create sends no signals
     print(f"Inserted {len(entries)} radicals into level 0.")
 
 
@@ -0,0 +1,62 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.management.base import BaseCommand
+from kanjilearner.constants import SRS_DEMOTIONS, SRS_INTERVALS, SRS_PROMOTIONS, SRSStage
+from kanjilearner.services.scheduling import REVIEW_SCHEDULERS, schedule_review
+
+START = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+
+REVIEW_STAGES = list(SRS_INTERVALS)
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate users working through their reviews under each REVIEW_SCHEDULER "
+        "and report the peak vs average rate of the refreshes clients make when "
+        "reviews come due (no database access)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--items", type=int, default=30, help="items in review per user")
+        parser.add_argument("--days", type=int, default=3)
+        parser.add_argument("--accuracy", type=float, default=0.85, help="share of answers that are correct")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'scheduler':<10} {'requests':>10} {'avg/min':>9} {'peak/min':>9} {'peak/avg':>9}")
+        for name, scheduler in REVIEW_SCHEDULERS.items():
+            per_minute = simulate(scheduler, random.Random(options["seed"]), **{
+                key: options[key] for key in ("users", "items", "days", "accuracy")
+            })
+            requests = sum(per_minute.values())
+            average = requests / (options["days"] * 24 * 60)
+            peak = max(per_minute.values(), default=0)
+            ratio = peak / average if average else 0
+            self.stdout.write(f"{name:<10} {requests:>10} {average:>9.1f} {peak:>9} {ratio:>9.1f}")
+
+
+def simulate(scheduler, rng, users, items, days, accuracy):
+    """
+    Requests per minute since START. Each user's client refreshes once when
+    a batch of their reviews comes due (one request per distinct due time);
+    the user then answers each review after a random delay of up to 6 hours.
+    """
+    end = START + timedelta(days=days)
+    per_minute = Counter()
+    for user_id in range(1, users + 1):
+        due_times = set()
+        for _ in range(items):
+            stage = rng.choice(REVIEW_STAGES[:6])  # mostly apprentice / guru
+            due = schedule_review(user_id, stage, START + timedelta(seconds=rng.randrange(86400)), scheduler, rng)
+            while due < end:
+                due_times.add(due)
+                answered = due + timedelta(seconds=rng.randrange(6 * 3600))
+                stage = SRS_PROMOTIONS[stage] if rng.random() < accuracy else SRS_DEMOTIONS[stage]
+                if stage == SRSStage.BURNED:
+                    break
+                due = schedule_review(user_id, stage, answered, scheduler, rng)
+        for due in due_times:
+            per_minute[int((due - START).total_seconds()) // 60] += 1
+    return per_minute
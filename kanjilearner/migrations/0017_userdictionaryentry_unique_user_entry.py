@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_user_entries(apps, schema_editor):
+    """Keep the oldest UDE per (user, entry) so the unique constraint can be added."""
+    UserDictionaryEntry = apps.get_model("kanjilearner", "UserDictionaryEntry")
+
+    duplicates = (
+        UserDictionaryEntry.objects
+        .values("user_id", "entry_id")
+        .annotate(keep_id=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for dup in duplicates:
+        (
+            UserDictionaryEntry.objects
+            .filter(user_id=dup["user_id"], entry_id=dup["entry_id"])
+            .exclude(id=dup["keep_id"])
+            .delete()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanjilearner', '0016_alter_userdictionaryentry_srs_stage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_user_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userdictionaryentry',
+            constraint=models.UniqueConstraint(fields=('user', 'entry'), name='unique_user_entry'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:58
+
+import unicodedata
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('literal'), name='gin_trgm_ops'), name='entry_literal_trgm'),
+    django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('meaning'), name='gin_trgm_ops'), name='entry_meaning_trgm'),
+    django.contrib.postgres.indexes.GinIndex(fields=['search_readings'], name='entry_readings_trgm', opclasses=['gin_trgm_ops']),
+]
+
+
+def fill_search_readings(apps, schema_editor):
+    DictionaryEntry = apps.get_model("kanjilearner", "DictionaryEntry")
+
+    entries = list(DictionaryEntry.objects.only("reading", "kunyomi_readings", "onyomi_readings"))
+    for entry in entries:
+        readings = [entry.reading, *entry.kunyomi_readings, *entry.onyomi_readings]
+        entry.search_readings = " ".join(
+            unicodedata.normalize("NFKC", r).casefold() for r in readings if r
+        )
+    DictionaryEntry.objects.bulk_update(entries, ["search_readings"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanjilearner', '0018_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dictionaryentry',
+            name='search_readings',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_readings, migrations.RunPython.noop),
+        # Required by the trigram indexes below (and SEARCH_BACKEND="trigram")
+        TrigramExtension(),
+        *[
+            migrations.AddIndex(model_name='dictionaryentry', index=index)
+            for index in TRIGRAM_INDEXES
+        ],
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:18
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanjilearner', '0019_dictionaryentry_search_readings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='userdictionaryentry',
+            name='review_history',
+        ),
+        migrations.CreateModel(
+            name='ReviewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('correct', models.BooleanField()),
+                ('stage_before', models.CharField(choices=[('LOCKED', 'Locked'), ('LESSON', 'Lesson'), ('APPRENTICE_1', 'Apprentice 1'), ('APPRENTICE_2', 'Apprentice 2'), ('APPRENTICE_3', 'Apprentice 3'), ('APPRENTICE_4', 'Apprentice 4'), ('GURU_1', 'Guru 1'), ('GURU_2', 'Guru 2'), ('MASTER', 'Master'), ('ENLIGHTENED', 'Enlightened'), ('BURNED', 'Burned')], max_length=30)),
+                ('stage_after', models.CharField(choices=[('LOCKED', 'Locked'), ('LESSON', 'Lesson'), ('APPRENTICE_1', 'Apprentice 1'), ('APPRENTICE_2', 'Apprentice 2'), ('APPRENTICE_3', 'Apprentice 3'), ('APPRENTICE_4', 'Apprentice 4'), ('GURU_1', 'Guru 1'), ('GURU_2', 'Guru 2'), ('MASTER', 'Master'), ('ENLIGHTENED', 'Enlightened'), ('BURNED', 'Burned')], max_length=30)),
+                ('latency_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanjilearner.dictionaryentry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user', 'timestamp'], name='reviewevent_user_time'), django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='reviewevent_time_brin')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:20
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: reviews keep being written while the indexes build
+    atomic = False
+
+    dependencies = [
+        ('kanjilearner', '0020_reviewevent_remove_review_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='userdictionaryentry',
+            index=models.Index(condition=models.Q(models.Q(('srs_stage__in', ['LOCKED', 'LESSON']), _negated=True), ('next_review_at__isnull', False)), fields=['user', 'next_review_at'], name='ude_user_due_review'),
+        ),
+        AddIndexConcurrently(
+            model_name='userdictionaryentry',
+            index=models.Index(condition=models.Q(('srs_stage', 'LESSON')), fields=['user'], name='ude_user_lesson'),
+        ),
+    ]
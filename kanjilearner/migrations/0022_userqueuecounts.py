@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanjilearner', '0021_ude_queue_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQueueCounts',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='queue_counts', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('lessons', models.PositiveIntegerField(default=0)),
+                ('review_buckets', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,24 +1,39 @@
+import math
+import unicodedata
+from collections import Counter
 from typing import Type
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.db import models
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models import QuerySet
+from django.db.models.functions import Upper
 from typing import Type
-from kanjilearner.constants import SRSStage, SRS_INTERVALS, EntryType
+from kanjilearner.constants import NOT_IN_REVIEWS, SRSStage, SRS_DEMOTIONS, SRS_PROMOTIONS, EntryType
+from kanjilearner.services.scheduling import schedule_review
+from kanjilearner.services.stage_cache import invalidate_stage_cache
+from kanjilearner.services.user_state import bump_user_state_stamp
 
 User = get_user_model()
 
 
-def ceil_to_next_hour(dt):
-    """Round a datetime up to the next exact hour."""
-    if dt.minute == 0 and dt.second == 0 and dt.microsecond == 0:
-        return dt  # already aligned
-    return dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+def review_due_key(next_review_at):
+    """
+    UserQueueCounts.review_buckets key for a review: when it comes due, in
+    epoch seconds, rounded up so the review is never counted before
+    get_reviews would return it.
+    """
+    return str(math.ceil(next_review_at.timestamp()))
+
+
+def normalize_search_text(text):
+    """Fold width variants (ＡＢ → AB, ｶﾅ → カナ) and case, for search matching."""
+    return unicodedata.normalize("NFKC", text).casefold()
 
 
 class DictionaryEntry(models.Model):
@@ -44,6 +59,10 @@ class DictionaryEntry(models.Model):
         help_text="Kana readings for vocab (e.g. たべる, みず)"
     )
 
+    # reading + kunyomi + onyomi, normalized and space-separated, for the trigram
+    # search index; kept in sync on save (see signals.py)
+    search_readings = models.TextField(blank=True, default="", editable=False)
+
     explanation = models.TextField(
         blank=True,
         help_text="Explain the definition in context and reading distinctions if multiple readings exist."
@@ -133,6 +152,19 @@ class DictionaryEntry(models.Model):
             ),
         ]
 
+        # pg_trgm indexes for services/search.py; UPPER() matches what icontains compares.
+        # Migration 0019 creates the pg_trgm extension they need.
+        indexes = [
+            GinIndex(OpClass(Upper("literal"), name="gin_trgm_ops"), name="entry_literal_trgm"),
+            GinIndex(OpClass(Upper("meaning"), name="gin_trgm_ops"), name="entry_meaning_trgm"),
+            GinIndex(fields=["search_readings"], opclasses=["gin_trgm_ops"], name="entry_readings_trgm"),
+        ]
+
+    def build_search_readings(self):
+        readings = [self.reading, *self.kunyomi_readings, *self.onyomi_readings]
+        # str() as CharField stores it, should a caller pass a non-string
+        return " ".join(normalize_search_text(str(r)) for r in readings if r)
+
     def __str__(self):
         if self.entry_type == EntryType.VOCAB and self.reading:
             return f"{self.literal} [{self.meaning}] /{self.reading}/ (Vocab)"
@@ -141,15 +173,79 @@ class DictionaryEntry(models.Model):
 
 
 
+class CatalogVersion(models.Model):
+    """
+    Single row (pk=1) counting changes to the DictionaryEntry catalog.
+    Bumped by signals on entry save/delete and M2M changes; each worker
+    compares it with the version of its in-memory catalog (services/catalog.py).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def current(cls) -> int:
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        updated = cls.objects.filter(pk=1).update(
+            version=models.F("version") + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
 class RecentMistake(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recent_mistakes')
     entry = models.ForeignKey(DictionaryEntry, on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    # Per user: at most this many rows, of which reads show the last 24 hours
+    MAX_PER_USER = 50
+    WINDOW = timedelta(hours=24)
+
     @classmethod
     def clear_for_entry(cls, user, entry):
         cls.objects.filter(user=user, entry=entry).delete()
 
+    @classmethod
+    def recent(cls, user, now=None):
+        """The user's mistakes within WINDOW, newest first. Expired rows are filtered, not deleted."""
+        cutoff = (now or timezone.now()) - cls.WINDOW
+        return cls.objects.filter(user=user, timestamp__gte=cutoff).order_by("-timestamp", "-id")
+
+    @classmethod
+    def record_many(cls, user, entry_ids):
+        """
+        Append a mistake per entry id (in order) and trim the user's mistakes
+        to the newest MAX_PER_USER, in one statement: the INSERT runs in a
+        CTE, and the DELETE keeps the newest MAX_PER_USER - len(entry_ids)
+        of the rows that were there before (the CTE's rows aren't visible to
+        the rest of the statement). Expired mistakes stay until the cap
+        pushes them out; recent() filters them.
+        """
+        entry_ids = list(entry_ids)[-cls.MAX_PER_USER:]
+        if not entry_ids:
+            return
+
+        qn = connection.ops.quote_name
+        table = qn(cls._meta.db_table)
+        user_id, timestamp = qn("user_id"), qn("timestamp")
+        values = ", ".join(["(%s, %s, %s)"] * len(entry_ids))
+        sql = (
+            f"WITH {qn('inserted')} AS ("
+            f"INSERT INTO {table} ({user_id}, {qn('entry_id')}, {timestamp}) VALUES {values}) "
+            f"DELETE FROM {table} WHERE {qn('id')} IN ("
+            f"SELECT {qn('id')} FROM {table} WHERE {user_id} = %s "
+            f"ORDER BY {timestamp} DESC, {qn('id')} DESC OFFSET %s)"
+        )
+        now = timezone.now()
+        params = [value for entry_id in entry_ids for value in (user.id, entry_id, now)]
+        params += [user.id, cls.MAX_PER_USER - len(entry_ids)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
     class Meta:
         indexes = [
             models.Index(fields=['user', 'timestamp']),
@@ -157,6 +253,118 @@ class RecentMistake(models.Model):
         ordering = ['-timestamp']
 
 
+class UserQueueCounts(models.Model):
+    """
+    One row per user with the dashboard badge counts: lessons available, and
+    reviews per time they come due at (see review_due_key). Updated along with
+    the UDEs by unlock / complete_lesson / promote / demote and the review
+    services, so reading the counts is a single primary-key lookup.
+    The rebuild_queue_counts command recomputes them from the UDEs.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="queue_counts")
+    lessons = models.PositiveIntegerField(default=0)
+    # {review_due_key: number of reviews due then}; times with none are left out.
+    # Reviews are scheduled in hourly batches (services/scheduling.py), so this
+    # holds about one key per hour ahead, except under the jitter scheduler
+    review_buckets = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def queue_slot(srs_stage, next_review_at):
+        """("lesson", None), ("review", bucket) or None: where a UDE in this state is counted."""
+        if srs_stage == SRSStage.LESSON:
+            return ("lesson", None)
+        if srs_stage not in NOT_IN_REVIEWS and next_review_at is not None:
+            return ("review", review_due_key(next_review_at))
+        return None
+
+    @classmethod
+    def record_changes(cls, user_id, changes):
+        """
+        Apply UDE state changes, each a pair of (srs_stage, next_review_at)
+        before and after, to the user's counts. Call after the UDEs are
+        written, in the same transaction: a user without a counts row gets
+        one rebuilt instead.
+        Also drops the user's stage cache (item spread) if any stage changed.
+        """
+        changes = list(changes)
+        if any(before[0] != after[0] for before, after in changes):
+            invalidate_stage_cache(user_id)
+
+        lessons = 0
+        buckets = Counter()
+        for before, after in changes:
+            for slot, sign in ((cls.queue_slot(*before), -1), (cls.queue_slot(*after), 1)):
+                if slot is None:
+                    continue
+                kind, bucket = slot
+                if kind == "lesson":
+                    lessons += sign
+                else:
+                    buckets[bucket] += sign
+
+        buckets = {bucket: delta for bucket, delta in buckets.items() if delta}
+        if not lessons and not buckets:
+            return
+
+        with transaction.atomic():
+            counts = cls.objects.select_for_update().filter(pk=user_id).first()
+            if counts is None:
+                cls.rebuild(user_id)
+                return
+            counts.lessons = max(counts.lessons + lessons, 0)
+            for bucket, delta in buckets.items():
+                count = counts.review_buckets.get(bucket, 0) + delta
+                if count > 0:
+                    counts.review_buckets[bucket] = count
+                else:
+                    counts.review_buckets.pop(bucket, None)
+            counts.save()
+
+    @classmethod
+    def rebuild(cls, user_id) -> "UserQueueCounts":
+        """Recompute the user's counts from their UDEs (one query per queue index)."""
+        udes = UserDictionaryEntry.objects.filter(user_id=user_id)
+        due = (
+            udes
+            .exclude(srs_stage__in=NOT_IN_REVIEWS)
+            .filter(next_review_at__isnull=False)
+            .values_list("next_review_at", flat=True)
+        )
+        with transaction.atomic():
+            # Create the row if it's missing, then lock it before counting:
+            # a writer whose UDE change the counts below don't see hasn't
+            # committed yet, and applies its delta on top once we're done
+            cls.objects.bulk_create([cls(user_id=user_id)], ignore_conflicts=True)
+            counts = cls.objects.select_for_update().get(pk=user_id)
+            counts.lessons = udes.filter(srs_stage=SRSStage.LESSON).count()
+            counts.review_buckets = dict(Counter(review_due_key(review_at) for review_at in due))
+            counts.save()
+        return counts
+
+    @classmethod
+    def for_user(cls, user_id) -> "UserQueueCounts":
+        return cls.objects.filter(pk=user_id).first() or cls.rebuild(user_id)
+
+    def summary(self, now=None):
+        """
+        Lesson and due review counts, and when the next (not yet due) reviews
+        come in. Reviews are due when next_review_at <= now, as in get_reviews.
+        """
+        now_ts = (now or timezone.now()).timestamp()
+        reviews = 0
+        upcoming = []
+        for due_at, count in self.review_buckets.items():
+            if int(due_at) <= now_ts:
+                reviews += count
+            else:
+                upcoming.append(int(due_at))
+        next_review_at = None
+        if upcoming:
+            next_review_at = datetime.fromtimestamp(min(upcoming), tz=dt_timezone.utc)
+        return {"lessons": self.lessons, "reviews": reviews, "next_review_at": next_review_at}
+
+
 class UserDictionaryEntry(models.Model):
     user = models.ForeignKey("auth.User", on_delete=models.CASCADE)
     entry = models.ForeignKey("DictionaryEntry", on_delete=models.CASCADE)
@@ -172,9 +380,6 @@ class UserDictionaryEntry(models.Model):
     next_review_at = models.DateTimeField(null=True, blank=True)
     last_reviewed_at = models.DateTimeField(null=True, blank=True)
 
-    # Review history — structured data (timestamps, results, etc.)
-    review_history = models.JSONField(default=list, blank=True)
-
     # User-provided synonyms — list of plain strings
     user_synonyms = ArrayField(
         models.CharField(max_length=100),
@@ -189,119 +394,149 @@ class UserDictionaryEntry(models.Model):
         default=list
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "entry"], name="unique_user_entry"),
+        ]
+        # Partial indexes for the review / lesson queues: each covers only the
+        # few rows its queries can return, out of ~800 per user
+        indexes = [
+            # get_reviews, get_review_forecast: user + due-time range
+            models.Index(
+                fields=["user", "next_review_at"],
+                condition=~models.Q(srs_stage__in=NOT_IN_REVIEWS) & models.Q(next_review_at__isnull=False),
+                name="ude_user_due_review",
+            ),
+            # get_lessons
+            models.Index(
+                fields=["user"],
+                condition=models.Q(srs_stage=SRSStage.LESSON),
+                name="ude_user_lesson",
+            ),
+        ]
+
+    @classmethod
+    def bulk_get_or_create(cls: Type["UserDictionaryEntry"], user: "User", entries) -> list["UserDictionaryEntry"]:
+        """
+        Return the user's UDE for each entry (same order), creating missing ones.
+        Entries can be DictionaryEntry or catalog entries; only .id is used.
+        One SELECT for existing rows; if any are missing, one
+        INSERT ... ON CONFLICT DO NOTHING plus one SELECT to read them back.
+        """
+        entries = list(entries)
+        entry_ids = {entry.id for entry in entries}
+
+        ude_map = {
+            ude.entry_id: ude
+            for ude in cls.objects.filter(user=user, entry_id__in=entry_ids)
+        }
+
+        missing_ids = entry_ids - ude_map.keys()
+        if missing_ids:
+            cls.objects.bulk_create(
+                [cls(user=user, entry_id=entry_id) for entry_id in missing_ids],
+                ignore_conflicts=True,
+            )
+            bump_user_state_stamp(user.id)  # bulk_create sends no post_save
+            # ignore_conflicts doesn't return pks, and a concurrent request may have won the race
+            ude_map.update(
+                (ude.entry_id, ude)
+                for ude in cls.objects.filter(user=user, entry_id__in=missing_ids)
+            )
+
+        udes = []
+        for entry in entries:
+            ude = ude_map[entry.id]
+            ude.user = user
+            if isinstance(entry, DictionaryEntry):
+                ude.entry = entry
+            udes.append(ude)
+        return udes
+
     @classmethod
     def get_pending_reviews(cls: Type["UserDictionaryEntry"], user: "User") -> QuerySet["UserDictionaryEntry"]:
-        return cls.objects.filter(
-            user=user,
-            srs_stage__in=[
-                SRSStage.LESSON,
-                SRSStage.APPRENTICE_1,
-                SRSStage.APPRENTICE_2,
-                SRSStage.APPRENTICE_3,
-                SRSStage.APPRENTICE_4,
-                SRSStage.GURU_1,
-                SRSStage.GURU_2,
-                SRSStage.MASTER,
-                SRSStage.ENLIGHTENED,
-            ],
-            next_review_at__lte=timezone.now()
-)
+        # Same filter as get_reviews, so it's served by the ude_user_due_review index
+        # (BURNED items have no next_review_at, so they never match)
+        return (
+            cls.objects
+            .filter(user=user)
+            .exclude(srs_stage__in=NOT_IN_REVIEWS)
+            .filter(next_review_at__lte=timezone.now())
+        )
+
+    @property
+    def queue_state(self):
+        """(srs_stage, next_review_at), as UserQueueCounts.record_changes takes them."""
+        return (self.srs_stage, self.next_review_at)
 
     def unlock(self):
         if not self.is_unlocked:
+            before = self.queue_state
             self.unlocked_at = timezone.now()
             self.srs_stage = SRSStage.LESSON
             self.next_review_at = None  # Waits for lesson to be completed
-            self.save()
+            with transaction.atomic():
+                self.save()
+                UserQueueCounts.record_changes(self.user_id, [(before, self.queue_state)])
 
     def complete_lesson(self):
         if self.srs_stage == SRSStage.LESSON:
+            before = self.queue_state
             self.srs_stage = SRSStage.APPRENTICE_1
-            self.next_review_at = timezone.now() + SRS_INTERVALS[SRSStage.APPRENTICE_1]
-            self.save()
-
-
-    def promote(self):
-        stage_order = [
-            SRSStage.LOCKED,
-            SRSStage.LESSON,
-            SRSStage.APPRENTICE_1,
-            SRSStage.APPRENTICE_2,
-            SRSStage.APPRENTICE_3,
-            SRSStage.APPRENTICE_4,
-            SRSStage.GURU_1,
-            SRSStage.GURU_2,
-            SRSStage.MASTER,
-            SRSStage.ENLIGHTENED,
-            SRSStage.BURNED,
-        ]
-
-        try:
-            index = stage_order.index(self.srs_stage)
-        except ValueError:
+            self.next_review_at = schedule_review(self.user_id, SRSStage.APPRENTICE_1, timezone.now())
+            with transaction.atomic():
+                self.save()
+                UserQueueCounts.record_changes(self.user_id, [(before, self.queue_state)])
+
+
+    # Columns promote() / demote() change
+    REVIEW_FIELDS = ["srs_stage", "next_review_at", "last_reviewed_at"]
+
+    def promote(self, now=None, save=True, promotions=SRS_PROMOTIONS):
+        """
+        Move up one SRS stage. now (default: the current time) is when the
+        review was answered; pass save=False to batch the write (the caller
+        then also updates UserQueueCounts). Review answers pass
+        promotions=REVIEW_PROMOTIONS, which leaves LOCKED items alone.
+        Views use services/srs.py instead, which does this in one UPDATE.
+        """
+        if self.srs_stage not in SRS_PROMOTIONS and self.srs_stage != SRSStage.BURNED:
             raise ValueError(f"Invalid stage value: {self.srs_stage}")
-        
-        if index < len(stage_order) - 1:
-            self.srs_stage = stage_order[index + 1]
-            self.last_reviewed_at = timezone.now()
 
-            if self.srs_stage != SRSStage.BURNED:
-                raw_next = timezone.now() + SRS_INTERVALS[self.srs_stage]
-                self.next_review_at = ceil_to_next_hour(raw_next)
-            else:
-                self.next_review_at = None
+        if self.srs_stage in promotions:
+            now = now or timezone.now()
+            before = self.queue_state
+            self.srs_stage = promotions[self.srs_stage]
+            self.last_reviewed_at = now
+
+            self.next_review_at = schedule_review(self.user_id, self.srs_stage, now)
 
-            self.save()
+            if save:
+                with transaction.atomic():
+                    self.save(update_fields=self.REVIEW_FIELDS)
+                    UserQueueCounts.record_changes(self.user_id, [(before, self.queue_state)])
     
-    def demote(self):
-        """Demote item based on SRS rules when user gets it wrong."""
-        if self.srs_stage in {SRSStage.LOCKED, SRSStage.LESSON, SRSStage.BURNED}:
+    def demote(self, now=None, save=True):
+        """Demote item based on SRS rules when user gets it wrong. Same arguments as promote()."""
+        if self.srs_stage not in SRS_DEMOTIONS:
             return  # No demotion for Lessons, Burned, Or Init
 
-        # Unified demotion map, including A1 → A1 fallback
-        demotion_map = {
-            SRSStage.APPRENTICE_1: SRSStage.APPRENTICE_1,
-            SRSStage.APPRENTICE_2: SRSStage.APPRENTICE_1,
-            SRSStage.APPRENTICE_3: SRSStage.APPRENTICE_1,
-            SRSStage.APPRENTICE_4: SRSStage.APPRENTICE_1,
-            SRSStage.GURU_1: SRSStage.APPRENTICE_4,
-            SRSStage.GURU_2: SRSStage.APPRENTICE_4,
-            SRSStage.MASTER: SRSStage.GURU_1,
-            SRSStage.ENLIGHTENED: SRSStage.GURU_1,
-        }
-
-        new_stage = demotion_map.get(self.srs_stage, SRSStage.APPRENTICE_1)  # Safety fallback
+        now = now or timezone.now()
+        before = self.queue_state
+        new_stage = SRS_DEMOTIONS[self.srs_stage]
         self.srs_stage = new_stage
-        self.last_reviewed_at = timezone.now()
+        self.last_reviewed_at = now
 
-        raw_next = timezone.now() + SRS_INTERVALS[new_stage]
-        self.next_review_at = ceil_to_next_hour(raw_next)
+        self.next_review_at = schedule_review(self.user_id, new_stage, now)
 
-        self.save()
+        if save:
+            with transaction.atomic():
+                self.save(update_fields=self.REVIEW_FIELDS)
+                UserQueueCounts.record_changes(self.user_id, [(before, self.queue_state)])
     
     
     def record_recent_mistake(user, entry):
-        now = timezone.now()
-
-        # Delete old ones past 24h
-        RecentMistake.objects.filter(user=user, timestamp__lt=now - timedelta(hours=24)).delete()
-
-        # Count how many are left after purge
-        count = RecentMistake.objects.filter(user=user).count()
-
-        if count >= 50:
-            # Delete the oldest to make room
-            oldest = (
-                RecentMistake.objects
-                .filter(user=user)
-                .order_by('timestamp')
-                .first()
-            )
-            if oldest:
-                oldest.delete()
-
-        # Create the new mistake
-        RecentMistake.objects.create(user=user, entry=entry)
+        RecentMistake.record_many(user, [entry.id])
 
 
 
@@ -314,4 +549,32 @@ class PlannedEntry(models.Model):
         unique_together = ("user", "entry")
 
     def __str__(self):
-        return f"{self.user.username} → {self.entry.literal} (planned)"
\ No newline at end of file
+        return f"{self.user.username} → {self.entry.literal} (planned)"
+
+
+class ReviewEvent(models.Model):
+    """
+    One answered review, appended by the review endpoints and never updated.
+    Review history lives here rather than on UserDictionaryEntry, so UDE rows
+    stay narrow and every review is an INSERT instead of a rewrite.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="review_events")
+    entry = models.ForeignKey(DictionaryEntry, on_delete=models.CASCADE, related_name="+")
+    timestamp = models.DateTimeField(default=timezone.now)
+    correct = models.BooleanField()
+    stage_before = models.CharField(max_length=30, choices=SRSStage.choices)
+    stage_after = models.CharField(max_length=30, choices=SRSStage.choices)
+    # Time the user took to answer, as reported by the client
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "timestamp"], name="reviewevent_user_time"),
+            # Rows arrive in timestamp order, so a BRIN index stays a few pages
+            # and still narrows archive_review_events' range scans
+            BrinIndex(fields=["timestamp"], name="reviewevent_time_brin"),
+        ]
+        ordering = ["-timestamp"]
+
+    def __str__(self):
+        return f"{self.user.username} → {self.entry.literal}: {self.stage_before} → {self.stage_after}"
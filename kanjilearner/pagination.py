@@ -1,7 +1,86 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from itertools import islice
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from kanjilearner.services.search import iter_search_entries
 
 
 class SearchPagination(PageNumberPagination):
     page_size = 100  # default page size
     page_size_query_param = "page_size"  # allow ?page_size=50
-    max_page_size = 200
\ No newline at end of file
+    max_page_size = 200
+
+
+class SearchCursorPagination(BasePagination):
+    """
+    Keyset pagination for catalog search, keyed on (level, id).
+
+    Each page resumes scanning right after the previous page's last entry,
+    so deep pages cost the same as the first and nothing counts every match.
+    Start with ?cursor= (empty) and follow "next"; pass ?total=1 for an
+    "approximate_total" extrapolated from the part of the catalog scanned.
+    """
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    total_query_param = "total"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_catalog_search(self, catalog, query, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        after = self.decode_cursor(request)
+
+        # One extra match tells us whether there's a next page
+        matches = list(islice(iter_search_entries(catalog, query, after), page_size + 1))
+        self.has_next = len(matches) > page_size
+        page = [entry for _, entry in matches[:page_size]]
+        self.next_cursor = (page[-1].level, page[-1].id) if self.has_next else None
+
+        self.approximate_total = None
+        if request.query_params.get(self.total_query_param):
+            start = catalog.position_after(after)
+            end = matches[-1][0] + 1 if self.has_next else len(catalog.entries)
+            scanned = end - start
+            self.approximate_total = (
+                round(len(matches) * len(catalog.entries) / scanned) if scanned else 0
+            )
+        return page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            level, entry_id = b64decode(encoded.encode("ascii"), validate=True).decode("ascii").split(":")
+            return int(level), int(entry_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, key):
+        return b64encode(f"{key[0]}:{key[1]}".encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
+    def get_paginated_response(self, data):
+        response = {"next": self.get_next_link(), "results": data}
+        if self.approximate_total is not None:
+            response["approximate_total"] = self.approximate_total
+        return Response(response)
@@ -0,0 +1,125 @@
+import re
+from functools import cached_property
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.compat import SHORT_SEPARATORS, LONG_SEPARATORS
+from kanjilearner.services.render_cache import RenderedEntry
+
+
+# Stands in for each RenderedEntry during the single encoding pass
+ENTRY_PLACEHOLDER = "\x00entry:{index}\x00"
+ENCODED_ENTRY_RE = re.compile(rb'"\\u0000entry:(\d+)\\u0000"')
+
+
+class PrerenderedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that splices the pre-encoded bytes of RenderedEntry values
+    (see services/render_cache.py) into the output, so only per-user fields
+    get encoded per request. Output is identical to JSONRenderer's.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            # Pretty-printed output (e.g. the browsable API): take the plain path
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return self.encode(data)
+
+    def get_encoder(self, **kwargs):
+        return self.encoder_class(
+            ensure_ascii=self.ensure_ascii, allow_nan=not self.strict,
+            separators=SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+            **kwargs,
+        )
+
+    @cached_property
+    def encoder(self):
+        return self.get_encoder()
+
+    def encode(self, value):
+        """
+        Encode value in one pass with a placeholder string for each
+        RenderedEntry, then replace the placeholders with the entries' bytes.
+        """
+        entries = []
+
+        def default(obj):
+            if isinstance(obj, RenderedEntry):
+                entries.append(obj)
+                return ENTRY_PLACEHOLDER.format(index=len(entries) - 1)
+            return self.encoder.default(obj)
+
+        body = self.to_bytes(self.get_encoder(default=default).encode(value))
+        if not entries:
+            return body
+        return ENCODED_ENTRY_RE.sub(lambda match: entries[int(match[1])].render_json(self.dumps), body)
+
+    def dumps(self, value):
+        return self.to_bytes(self.encoder.encode(value))
+
+    def to_bytes(self, ret):
+        return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjson-backed JSONRenderer for the biggest responses (search, reviews,
+    forecast). Datetimes are encoded natively in the same format as DRF's
+    (UTC as "Z"); RenderedEntry bytes are spliced in without walking the data.
+
+    Unlike JSONRenderer, U+2028/U+2029 are left unescaped (still valid JSON).
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return self.dumps(data)
+
+    def dumps(self, value):
+        return orjson.dumps(value, default=self.default, option=self.options)
+
+    def default(self, obj):
+        if isinstance(obj, RenderedEntry):
+            return orjson.Fragment(obj.render_json(self.dumps))
+        return self.encoder_class().default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack alternative to JSON, picked by content negotiation
+    (Accept: application/msgpack, or ?format=msgpack).
+    Aware datetimes are packed as msgpack timestamps.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.default, datetime=True)
+
+    def default(self, obj):
+        if isinstance(obj, RenderedEntry):
+            return obj.data
+        # Naive datetimes, decimals, lazy strings...: as JSONRenderer would encode them
+        return self.encoder_class().default(obj)
+
+
+# For views that opt in with @renderer_classes(FAST_RENDERER_CLASSES)
+FAST_RENDERER_CLASSES = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
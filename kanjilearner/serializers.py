@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from kanjilearner.models import DictionaryEntry, PlannedEntry, UserDictionaryEntry
+from kanjilearner.services.catalog import CatalogEntry, get_catalog
+from kanjilearner.services.render_cache import get_entry_template
 
 
 class DictionaryEntrySerializer(serializers.ModelSerializer):
@@ -9,6 +11,7 @@ class DictionaryEntrySerializer(serializers.ModelSerializer):
     srs_stage = serializers.SerializerMethodField()
     next_review_at = serializers.SerializerMethodField()
     unlocked = serializers.SerializerMethodField()
+    audio = serializers.SerializerMethodField()
 
     class Meta:
         model = DictionaryEntry
@@ -35,38 +38,54 @@ class DictionaryEntrySerializer(serializers.ModelSerializer):
             'audio',
         ]
 
-    def get_constituents(self, obj):
+    def get_catalog(self):
+        # Views pass the catalog in context; otherwise fetch it once per serializer tree
+        if "catalog" not in self.context:
+            self.context["catalog"] = get_catalog()
+        return self.context["catalog"]
+
+    def to_representation(self, instance):
+        """
+        Entries are rendered from the in-memory catalog, not the ORM.
+        Accepts a CatalogEntry, a DictionaryEntry or an entry id.
+
+        The user-independent part is rendered once per catalog version and
+        cached; this returns a RenderedEntry filled from user_entry_map.
+        """
+        catalog = self.get_catalog()
+        if not isinstance(instance, CatalogEntry):
+            entry_id = instance.id if isinstance(instance, DictionaryEntry) else instance
+            instance = catalog.entries[entry_id]
+
+        def render(user_entry_map):
+            serializer = DictionaryEntrySerializer(
+                context={"catalog": catalog, "user_entry_map": user_entry_map}
+            )
+            return serializers.ModelSerializer.to_representation(serializer, instance)
+
+        template = get_entry_template(catalog, instance.id, render)
+        return template.bind(self.context.get("user_entry_map", {}))
+
+    def serialize_related(self, entries):
         return [
             {
-                "id": c.id,
-                "literal": c.literal,
-                "meaning": c.meaning,
-                "entry_type": c.entry_type,
+                "id": e.id,
+                "literal": e.literal,
+                "meaning": e.meaning,
+                "entry_type": e.entry_type,
+                "srs_stage": self.get_srs_stage(e),
             }
-            for c in obj.constituents.all()
+            for e in entries
         ]
 
+    def get_constituents(self, obj):
+        return self.serialize_related(self.get_catalog().related(obj.constituents))
+
     def get_visually_similar(self, obj):
-        return [
-            {
-                "id": v.id,
-                "literal": v.literal,
-                "meaning": v.meaning,
-                "entry_type": v.entry_type,
-            }
-            for v in obj.visually_similar.all()
-        ]
+        return self.serialize_related(self.get_catalog().related(obj.visually_similar))
 
     def get_used_in(self, obj):
-        return [
-            {
-                "id": u.id,
-                "literal": u.literal,
-                "meaning": u.meaning,
-                "entry_type": u.entry_type,
-            }
-            for u in obj.used_in.all()
-        ]
+        return self.serialize_related(self.get_catalog().related(obj.used_in))
 
     def get_user_entry(self, obj):
         entry_map = self.context.get("user_entry_map", {})
@@ -84,9 +103,13 @@ class DictionaryEntrySerializer(serializers.ModelSerializer):
         ude = self.get_user_entry(obj)
         return ude.next_review_at if ude else None
 
+    def get_audio(self, obj):
+        return obj.audio
+
 
 class UserDictionaryEntrySerializer(serializers.ModelSerializer):
-    entry = DictionaryEntrySerializer(read_only=True)
+    # Rendered from the catalog by id, so UDE querysets don't need to join entry
+    entry = DictionaryEntrySerializer(source="entry_id", read_only=True)
     in_plan = serializers.SerializerMethodField()
 
     class Meta:
@@ -100,4 +123,49 @@ class UserDictionaryEntrySerializer(serializers.ModelSerializer):
         ]
 
     def get_in_plan(self, obj):
-        return PlannedEntry.objects.filter(user=obj.user, entry=obj.entry).exists()
\ No newline at end of file
+        # Batched views pass the user's planned ids (see services/loaders.py)
+        planned_entry_ids = self.context.get("planned_entry_ids")
+        if planned_entry_ids is not None:
+            return obj.entry_id in planned_entry_ids
+        return PlannedEntry.objects.filter(user=obj.user, entry=obj.entry).exists()
+
+
+class ReviewCardSerializer(serializers.ModelSerializer):
+    """
+    Compact UDE projection for the lesson/review screens (?view=card): the
+    entry's literal, meaning, readings and type, without mnemonics,
+    explanations, pitch graphs or relations. Reads only srs_stage and
+    entry_id from the UDE, so views can load just those columns.
+    """
+    entry = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserDictionaryEntry
+        fields = ["entry", "srs_stage"]
+
+    # DictionaryEntrySerializer field names
+    entry_fields = [
+        "id",
+        "literal",
+        "meaning",
+        "kunyomi_readings",
+        "onyomi_readings",
+        "reading",
+        "entry_type",
+        "level",
+    ]
+
+    def get_entry(self, obj):
+        if "catalog" not in self.context:
+            self.context["catalog"] = get_catalog()
+        entry = self.context["catalog"].entries[obj.entry_id]
+        return {field: getattr(entry, field) for field in self.entry_fields}
+
+
+class ReviewResultSerializer(serializers.Serializer):
+    """One answer in a batch review submission (views.result_batch)."""
+    entry_id = serializers.IntegerField()
+    correct = serializers.BooleanField()
+    answered_at = serializers.DateTimeField(required=False)
+    # ReviewEvent.latency_ms is a 32-bit integer column
+    latency_ms = serializers.IntegerField(required=False, min_value=0, max_value=2147483647)
@@ -0,0 +1,283 @@
+"""
+Process-wide, read-only cache of the DictionaryEntry catalog.
+
+The dictionary only changes when an admin edits it, so each worker loads it
+once into immutable CatalogEntry objects (relations as tuples of ids) and
+reuses it across requests. CatalogVersion is bumped on every entry save/delete
+and M2M change (see signals.py); get_catalog() reloads when the version in the
+database no longer matches the one it loaded.
+"""
+import bisect
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from types import MappingProxyType
+from django.utils import timezone
+from kanjilearner.models import CatalogVersion, DictionaryEntry
+from kanjilearner.services.radicals import RadicalIndex
+from kanjilearner.services.search_index import SearchIndex, Typeahead
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    id: int
+    entry_type: str
+    literal: str
+    meaning: str
+    kunyomi_readings: tuple
+    onyomi_readings: tuple
+    reading: str
+    explanation: str
+    level: int
+    audio: str | None  # URL, or None without an audio clip
+    reading_mnemonic: str
+    meaning_mnemonic: str
+    parts_of_speech: tuple
+    pitch_graphs: tuple
+    constituents: tuple  # entry ids, ordered by (level, id)
+    visually_similar: tuple
+    used_in: tuple
+
+
+ENTRY_FIELDS = (
+    "id",
+    "entry_type",
+    "literal",
+    "meaning",
+    "kunyomi_readings",
+    "onyomi_readings",
+    "reading",
+    "explanation",
+    "level",
+    "audio",
+    "reading_mnemonic",
+    "meaning_mnemonic",
+    "parts_of_speech",
+    "pitch_graphs",
+)
+
+RELATION_FIELDS = ("constituents", "visually_similar", "used_in")
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    body: bytes
+    gzipped: bytes
+
+
+class Catalog:
+    """Immutable snapshot of every DictionaryEntry, ordered by (level, id)."""
+
+    def __init__(self, version, entries, updated_at=None):
+        self.version = version
+        self.loaded_at = timezone.now()
+        # When the catalog last changed, for Last-Modified headers
+        self.updated_at = updated_at or self.loaded_at
+        self.entries = MappingProxyType(entries)
+        # entry id → EntryTemplate, filled lazily (see services/render_cache.py)
+        self.templates = {}
+        self._entry_hashes = {}
+        # (level, id) of each entry, in order, for keyset lookups
+        self._keys = [(entry.level, entry.id) for entry in entries.values()]
+        self._search_fields = tuple(
+            (
+                entry,
+                tuple(
+                    field.lower()
+                    for field in (
+                        entry.literal,
+                        entry.meaning,
+                        entry.reading,
+                        *entry.kunyomi_readings,
+                        *entry.onyomi_readings,
+                    )
+                ),
+            )
+            for entry in entries.values()
+        )
+
+    @classmethod
+    def load(cls, version):
+        audio_storage = DictionaryEntry._meta.get_field("audio").storage
+
+        rows = DictionaryEntry.objects.order_by("level", "id").values_list(*ENTRY_FIELDS)
+        raw = {row[0]: dict(zip(ENTRY_FIELDS, row)) for row in rows}
+
+        relations = {}
+        for name in RELATION_FIELDS:
+            through = getattr(DictionaryEntry, name).through
+            adjacency = {}
+            for from_id, to_id in through.objects.values_list(
+                "from_dictionaryentry_id", "to_dictionaryentry_id"
+            ):
+                adjacency.setdefault(from_id, []).append(to_id)
+            relations[name] = adjacency
+
+        updated_at = CatalogVersion.objects.filter(pk=1).values_list("updated_at", flat=True).first()
+        return cls.build(version, raw, relations, audio_storage.url, updated_at)
+
+    @classmethod
+    def build(cls, version, raw, relations, audio_url, updated_at=None):
+        """
+        Build a catalog from entry field dicts (id → {field: value}, ordered by
+        (level, id)) and relation adjacency lists (name → {from id: [to ids]}).
+        """
+        def sort_key(entry_id):
+            return (raw[entry_id]["level"], entry_id)
+
+        entries = {}
+        for entry_id, fields in raw.items():
+            entries[entry_id] = CatalogEntry(
+                id=entry_id,
+                entry_type=fields["entry_type"],
+                literal=fields["literal"],
+                meaning=fields["meaning"],
+                kunyomi_readings=tuple(fields["kunyomi_readings"]),
+                onyomi_readings=tuple(fields["onyomi_readings"]),
+                reading=fields["reading"],
+                explanation=fields["explanation"],
+                level=fields["level"],
+                audio=audio_url(fields["audio"]) if fields["audio"] else None,
+                reading_mnemonic=fields["reading_mnemonic"],
+                meaning_mnemonic=fields["meaning_mnemonic"],
+                parts_of_speech=tuple(fields["parts_of_speech"]),
+                pitch_graphs=tuple(tuple(graph) for graph in fields["pitch_graphs"]),
+                **{
+                    name: tuple(sorted(relations[name].get(entry_id, ()), key=sort_key))
+                    for name in RELATION_FIELDS
+                },
+            )
+        return cls(version, entries, updated_at)
+
+    @cached_property
+    def content_hash(self):
+        """Hash of the whole catalog's content; unlike version, equal content → equal hash."""
+        digest = hashlib.sha256()
+        for entry in self.entries.values():
+            digest.update(repr(entry).encode())
+        return digest.hexdigest()[:32]
+
+    @cached_property
+    def snapshot(self):
+        """
+        The whole catalog as JSON (relations as id lists), plus a gzipped copy.
+        Built on first use, once per catalog version.
+        """
+        body = json.dumps(
+            {
+                "version": self.content_hash,
+                "entries": [asdict(entry) for entry in self.entries.values()],
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        return CatalogSnapshot(body, gzip.compress(body, compresslevel=9, mtime=0))
+
+    @cached_property
+    def search_index(self):
+        """Inverted n-gram index over this catalog (services/search_index.py)."""
+        return SearchIndex(self)
+
+    @cached_property
+    def typeahead(self):
+        """Prefix lookup over this catalog (services/search_index.py)."""
+        return Typeahead(self)
+
+    @cached_property
+    def radical_index(self):
+        """Radical → kanji bitsets (services/radicals.py)."""
+        return RadicalIndex(self)
+
+    def entry_hash(self, entry_id):
+        """Hash of one entry as rendered: its own fields plus its related entries."""
+        entry_hash = self._entry_hashes.get(entry_id)
+        if entry_hash is None:
+            entry = self.entries[entry_id]
+            related = [
+                self.entries[related_id]
+                for name in RELATION_FIELDS
+                for related_id in getattr(entry, name)
+            ]
+            entry_hash = hashlib.sha256(repr((entry, related)).encode()).hexdigest()[:32]
+            self._entry_hashes[entry_id] = entry_hash
+        return entry_hash
+
+    def get(self, entry_id):
+        try:
+            return self.entries.get(int(entry_id))
+        except (TypeError, ValueError):
+            return None
+
+    def related(self, entry_ids):
+        return [self.entries[entry_id] for entry_id in entry_ids]
+
+    def search(self, query):
+        """Case-insensitive substring match on literal, meaning and readings."""
+        return [entry for _, entry in self.iter_search(query)]
+
+    def iter_search(self, query, after=None):
+        """
+        Lazily yield (position, entry) for search matches, starting right after
+        the (level, id) key `after`; position is the entry's index in the catalog.
+        """
+        query = query.lower()
+        for position in range(self.position_after(after), len(self._search_fields)):
+            entry, fields = self._search_fields[position]
+            if any(query in field for field in fields):
+                yield position, entry
+
+    def position_after(self, after):
+        """Index of the first entry past the (level, id) key `after`."""
+        return bisect.bisect_right(self._keys, tuple(after)) if after else 0
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Return this worker's catalog, reloading it if the version has moved on."""
+    global _catalog
+
+    # Read the version before loading, so a concurrent edit can only make us reload again
+    version = CatalogVersion.current()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = Catalog.load(version)
+            catalog = _catalog
+    return catalog
+
+
+def get_loaded_catalog() -> Catalog:
+    """
+    This worker's catalog without checking the version (no query), for paths
+    that can trail an admin edit by a request or so. Loads it if needed.
+    """
+    return _catalog or get_catalog()
+
+
+def get_request_catalog(request):
+    """
+    get_catalog(), checked once per request: conditional-GET callbacks and
+    the view itself all see the same catalog. Accepts a DRF or Django request.
+    """
+    http_request = getattr(request, "_request", request)
+    if not hasattr(http_request, "kanjilearner_catalog"):
+        http_request.kanjilearner_catalog = get_catalog()
+    return http_request.kanjilearner_catalog
+
+
+def invalidate_catalog():
+    global _catalog
+    _catalog = None
+
+
+def bump_catalog_version():
+    """Mark the catalog as changed, for this worker and every other one."""
+    CatalogVersion.bump()
+    invalidate_catalog()
@@ -0,0 +1,173 @@
+"""
+Aggregates for the landing page: review forecast, item spread and recent
+mistakes (queue counts come from UserQueueCounts), read together by
+dashboard_summary. Each is a single aggregate query over the user's rows;
+none of them load or serialize entries.
+"""
+import math
+from contextlib import contextmanager
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from kanjilearner.constants import NOT_IN_REVIEWS, STAGE_GROUPS, EntryType, SRSStage
+from kanjilearner.models import RecentMistake, UserDictionaryEntry, UserQueueCounts
+from kanjilearner.services import stage_cache
+from kanjilearner.services.user_state import get_user_state_stamp
+
+# get_item_spread's keys for each entry type
+ENTRY_TYPE_KEYS = {
+    EntryType.RADICAL: "radicals",
+    EntryType.KANJI: "kanji",
+    EntryType.VOCAB: "vocab",
+}
+
+STAGE_GROUP_OF = {stage: group for group, stages in STAGE_GROUPS.items() for stage in stages}
+
+
+@contextmanager
+def read_only_transaction():
+    """
+    transaction.atomic(), run by Postgres as REPEATABLE READ READ ONLY so
+    every query inside sees the same snapshot. Nested in another transaction
+    (ATOMIC_REQUESTS, tests) it's a plain savepoint in that transaction.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        yield
+
+
+def item_spread(user):
+    """Item counts per STAGE_GROUPS group and entry type, from one GROUP BY."""
+    results = {
+        group: {key: 0 for key in ENTRY_TYPE_KEYS.values()}
+        for group in STAGE_GROUPS
+    }
+    rows = (
+        UserDictionaryEntry.objects
+        .filter(user=user, srs_stage__in=STAGE_GROUP_OF.keys())
+        .values_list("srs_stage", "entry__entry_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for srs_stage, entry_type, count in rows:
+        results[STAGE_GROUP_OF[srs_stage]][ENTRY_TYPE_KEYS[entry_type]] += count
+    return results
+
+
+def cached_item_spread(user):
+    """item_spread, cached until one of the user's stages changes (services/stage_cache.py)."""
+    spread = stage_cache.get_item_spread(user.id)
+    if spread is None:
+        spread = item_spread(user)
+        stage_cache.set_item_spread(user.id, spread)
+    return spread
+
+
+def recent_mistake_count(user, now=None):
+    return RecentMistake.recent(user, now).count()
+
+
+def review_forecast(user, user_tz, now=None):
+    """
+    Upcoming reviews for the next 7 days, bucketed by local date (YYYY-MM-DD)
+    and hour (00-23), as get_review_forecast returns them. Postgres does the
+    bucketing (date_trunc over AT TIME ZONE, GROUP BY), so only the
+    non-empty hours come back.
+    """
+    now_utc = now or timezone.now()
+    now_local = now_utc.astimezone(user_tz)
+
+    # Range: now → 7 days from now (local 23:59:59)
+    local_end = (now_local + timedelta(days=7)).replace(
+        hour=23, minute=59, second=59, microsecond=0
+    )
+    utc_start = now_local.astimezone(dt_timezone.utc)
+    utc_end = local_end.astimezone(dt_timezone.utc)
+
+    # Count reviews due in this 7-day window per local hour
+    hour_counts = (
+        UserDictionaryEntry.objects
+        .filter(user=user)
+        .exclude(srs_stage__in=[*NOT_IN_REVIEWS, SRSStage.BURNED])
+        .filter(next_review_at__gt=utc_start, next_review_at__lte=utc_end)
+        .annotate(hour=TruncHour("next_review_at", tzinfo=user_tz))
+        .values("hour")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    raw_buckets = {
+        (row["hour"].strftime("%Y-%m-%d"), f"{row['hour'].hour:02d}"): row["count"]
+        for row in hour_counts
+    }
+
+    # Build result: always 7 days × 24 hours
+    result = {}
+    cumulative = 0
+    for offset in range(7):
+        day = (now_local + timedelta(days=offset)).date()
+        day_str = day.strftime("%Y-%m-%d")
+        result[day_str] = {}
+        for hour in [f"{h:02d}" for h in range(24)]:
+            count = raw_buckets.get((day_str, hour), 0)
+            cumulative += count
+            result[day_str][hour] = {"count": count, "cumulative": cumulative}
+
+    return result
+
+
+def cached_review_forecast(user, user_tz, now=None):
+    """
+    review_forecast, cached per (user, tz, hour). The forecast changes when
+    the user's state changes, which bumps their state stamp; when the clock
+    passes an hour boundary (UTC or local, for half-hour zones); and when one
+    of the counted reviews comes due, which the offset and jitter schedulers
+    (services/scheduling.py) put anywhere in the hour. So the entry expires
+    at the next due review, from UserQueueCounts, or the end of the hour,
+    whichever comes first.
+    """
+    now_utc = now or timezone.now()
+    now_ts = int(now_utc.timestamp())
+    utc_hour = now_ts // 3600
+    local_hour = now_utc.astimezone(user_tz).strftime("%Y%m%d%H")
+    stamp = get_user_state_stamp(user.id)
+    key = f"kanjilearner:review_forecast:{user.id}:{user_tz.key}:{utc_hour}:{local_hour}:{stamp}"
+
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = review_forecast(user, user_tz, now_utc)
+        # No use keeping it past the hour: the key won't be asked for again
+        expires = (utc_hour + 1) * 3600
+        next_review_at = UserQueueCounts.for_user(user.id).summary(now_utc)["next_review_at"]
+        if next_review_at is not None:
+            expires = min(expires, math.ceil(next_review_at.timestamp()))
+        cache.set(key, forecast, max(expires - now_ts, 1))
+    return forecast
+
+
+def dashboard_summary(user, user_tz):
+    """
+    Everything the landing page shows, from one read-only transaction:
+    lessons and reviews from UserQueueCounts (as get_queue_counts), and the
+    forecast, item spread and recent mistakes, so whatever is read from the
+    database comes from the same snapshot. The forecast and item spread are
+    served from their caches when fresh, as their own endpoints serve them.
+    """
+    now = timezone.now()
+    # A missing counts row is rebuilt (written) first: the transaction is read-only
+    UserQueueCounts.for_user(user.id)
+    with read_only_transaction():
+        counts = UserQueueCounts.objects.get(pk=user.id).summary(now)
+        return {
+            "lessons": counts["lessons"],
+            "reviews": counts["reviews"],
+            "forecast": cached_review_forecast(user, user_tz, now),
+            "item_spread": cached_item_spread(user),
+            "recent_mistakes": recent_mistake_count(user, now),
+        }
@@ -0,0 +1,105 @@
+"""
+Kana and romaji normalization for search.
+
+normalize_kana() folds width variants, case and katakana into one form
+(ﾀﾍﾞﾙ, タベル, たべる → たべる); romaji_to_hiragana() turns Hepburn-style
+romaji input into hiragana (taberu → たべる), or None when it isn't romaji.
+"""
+from kanjilearner.models import normalize_search_text
+
+KATAKANA_START, KATAKANA_END = ord("ァ"), ord("ヶ")
+KATAKANA_OFFSET = ord("ァ") - ord("ぁ")
+
+VOWELS = {"a": "あ", "i": "い", "u": "う", "e": "え", "o": "お"}
+
+ROWS = {
+    "k": "かきくけこ", "g": "がぎぐげご",
+    "s": "さしすせそ", "z": "ざじずぜぞ",
+    "t": "たちつてと", "d": "だぢづでど",
+    "n": "なにぬねの",
+    "h": "はひふへほ", "b": "ばびぶべぼ", "p": "ぱぴぷぺぽ",
+    "m": "まみむめも",
+    "r": "らりるれろ",
+}
+
+# Consonant → i-row kana, for ya / yu / yo combinations (kya → きゃ)
+YOUON = {
+    "ky": "き", "gy": "ぎ", "sy": "し", "zy": "じ", "ty": "ち", "dy": "ぢ",
+    "ny": "に", "hy": "ひ", "by": "び", "py": "ぴ", "my": "み", "ry": "り",
+    "sh": "し", "ch": "ち", "j": "じ", "jy": "じ",
+}
+SMALL_Y = {"a": "ゃ", "u": "ゅ", "o": "ょ"}
+
+
+def _build_romaji_table():
+    table = dict(VOWELS)
+    for consonant, kana in ROWS.items():
+        for vowel, char in zip("aiueo", kana):
+            table[consonant + vowel] = char
+    table.update({
+        "ya": "や", "yu": "ゆ", "yo": "よ",
+        "wa": "わ", "wo": "を",
+        "shi": "し", "chi": "ち", "tsu": "つ", "fu": "ふ", "ji": "じ",
+        "-": "ー",
+    })
+    for consonant, kana in YOUON.items():
+        for vowel, small in SMALL_Y.items():
+            table[consonant + vowel] = kana + small
+    # sh / ch / j also combine with e (she → しぇ)
+    table.update({"she": "しぇ", "che": "ちぇ", "je": "じぇ"})
+    return table
+
+
+ROMAJI_TABLE = _build_romaji_table()
+LONGEST_ROMAJI = max(len(key) for key in ROMAJI_TABLE)
+
+
+def katakana_to_hiragana(text):
+    return "".join(
+        chr(ord(char) - KATAKANA_OFFSET) if KATAKANA_START <= ord(char) <= KATAKANA_END else char
+        for char in text
+    )
+
+
+def normalize_kana(text):
+    """Width variants, case and katakana folded: ＴＡＢＥ → tabe, ﾀﾍﾞﾙ → たべる."""
+    return katakana_to_hiragana(normalize_search_text(text))
+
+
+def romaji_to_hiragana(text):
+    """
+    Convert romaji (after normalize_kana) to hiragana, longest match first.
+    Doubled consonants become っ; n before a consonant, n' and a final nn become ん.
+    Returns None if any part of text isn't romaji.
+    """
+    out = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == " ":
+            i += 1
+            continue
+        next_char = text[i + 1] if i + 1 < len(text) else ""
+        # Sokuon: kk, tt, tch, ... → っ
+        if (char == next_char and char.isalpha() and char not in "aiueon") or (char == "t" and next_char == "c"):
+            out.append("っ")
+            i += 1
+            continue
+        # ん: n before a consonant or at the end, n' and nn (but onna → おんな)
+        if char == "n" and (not next_char or next_char not in "aiueoy"):
+            after = text[i + 2] if i + 2 < len(text) else ""
+            out.append("ん")
+            if next_char == "'" or (next_char == "n" and (not after or after not in "aiueoy")):
+                i += 2
+            else:
+                i += 1
+            continue
+        for length in range(LONGEST_ROMAJI, 0, -1):
+            kana = ROMAJI_TABLE.get(text[i:i + length])
+            if kana:
+                out.append(kana)
+                i += length
+                break
+        else:
+            return None
+    return "".join(out) or None
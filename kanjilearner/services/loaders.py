@@ -0,0 +1,58 @@
+from kanjilearner.models import PlannedEntry, UserDictionaryEntry
+from kanjilearner.services.catalog import RELATION_FIELDS, get_catalog
+
+# The UDE columns UserDictionaryEntrySerializer and DictionaryEntrySerializer read;
+# synonyms and sentences can be large and are never rendered
+USER_ENTRY_FIELDS = ("user", "entry", "srs_stage", "unlocked_at", "next_review_at")
+
+
+def load_user_entries(user, udes, catalog=None):
+    """
+    Batch-load everything UserDictionaryEntrySerializer needs for a list of UDEs,
+    so serializing N rows costs a constant number of queries instead of ~4N.
+
+    - Entries and their constituents / visually_similar / used_in come from the
+      in-memory catalog (services/catalog.py), so UDEs don't need entry loaded
+    - Builds user_entry_map (entry id → UDE) for the entries and all their
+      related entries, so nested items carry the user's SRS state
+    - Fetches the user's planned entry ids in one query
+
+    Returns (udes, context); pass context to the serializer.
+    """
+    if catalog is None:
+        catalog = get_catalog()
+
+    udes = list(udes)
+    entry_ids = [ude.entry_id for ude in udes]
+
+    # UDEs we already hold don't need to be fetched again
+    user_entry_map = {ude.entry_id: ude for ude in udes}
+    related_ids = {
+        related_id
+        for entry_id in entry_ids
+        for relation in RELATION_FIELDS
+        for related_id in getattr(catalog.entries[entry_id], relation)
+    }
+    missing_ids = related_ids - user_entry_map.keys()
+    if missing_ids:
+        related_udes = (
+            UserDictionaryEntry.objects
+            .filter(user=user, entry_id__in=missing_ids)
+            .only(*USER_ENTRY_FIELDS)
+        )
+        user_entry_map.update((ude.entry_id, ude) for ude in related_udes)
+
+    planned_entry_ids = set()
+    if entry_ids:
+        planned_entry_ids = set(
+            PlannedEntry.objects
+            .filter(user=user, entry_id__in=entry_ids)
+            .values_list("entry_id", flat=True)
+        )
+
+    context = {
+        "catalog": catalog,
+        "user_entry_map": user_entry_map,
+        "planned_entry_ids": planned_entry_ids,
+    }
+    return udes, context
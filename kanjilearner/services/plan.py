@@ -1,47 +1,52 @@
 from kanjilearner.models import DictionaryEntry, UserDictionaryEntry, PlannedEntry
 from kanjilearner.constants import SRSStage
+from kanjilearner.services.catalog import CatalogEntry, get_catalog
+
+GURUED_STAGES = {
+    SRSStage.GURU_1,
+    SRSStage.GURU_2,
+    SRSStage.MASTER,
+    SRSStage.ENLIGHTENED,
+    SRSStage.BURNED,
+}
+
 
 def is_gurued(user_entry: UserDictionaryEntry) -> bool:
-    return user_entry.srs_stage in {
-        SRSStage.GURU_1,
-        SRSStage.GURU_2,
-        SRSStage.MASTER,
-        SRSStage.ENLIGHTENED,
-        SRSStage.BURNED,
-    }
+    return user_entry.srs_stage in GURUED_STAGES
 
-def plan_entry(user, entry: DictionaryEntry):
+def plan_entry(user, entry: DictionaryEntry | CatalogEntry, catalog=None):
     """
     Recursively add entry to lessons or plan queue.
+    Prerequisites are read from the in-memory catalog.
     """
+    if catalog is None:
+        catalog = get_catalog()
 
-    try:
-        ude = UserDictionaryEntry.objects.get(user=user, entry=entry)
-        if is_gurued(ude):
-            return  # already gurued, no need to plan
-        if ude.srs_stage != SRSStage.LOCKED:
-            return  # already in lessons or apprentices
-    except UserDictionaryEntry.DoesNotExist:
-        ude = UserDictionaryEntry.objects.create(user=user, entry=entry)
+    # get_or_create re-reads the row if a concurrent request inserted it first
+    ude, _ = UserDictionaryEntry.objects.get_or_create(user=user, entry_id=entry.id)
+    if is_gurued(ude):
+        return  # already gurued, no need to plan
+    if ude.srs_stage != SRSStage.LOCKED:
+        return  # already in lessons or apprentices
 
     # Check prerequisites
     all_ready = True
-    for prereq in entry.constituents.all():
+    for prereq in catalog.related(catalog.entries[entry.id].constituents):
         try:
-            prereq_ude = UserDictionaryEntry.objects.get(user=user, entry=prereq)
+            prereq_ude = UserDictionaryEntry.objects.get(user=user, entry_id=prereq.id)
             if not is_gurued(prereq_ude):
                 all_ready = False
                 if prereq_ude.srs_stage == SRSStage.LOCKED:
                     prereq_ude.unlock()
         except UserDictionaryEntry.DoesNotExist:
             # Recursively plan prereq
-            plan_entry(user, prereq)
+            plan_entry(user, prereq, catalog)
             all_ready = False
 
     if all_ready:
         ude.unlock()
     else:
-        PlannedEntry.objects.get_or_create(user=user, entry=entry)
+        PlannedEntry.objects.get_or_create(user=user, entry_id=entry.id)
 
 
 """
@@ -50,15 +55,27 @@ is Gurued (or higher), unlock the entry (move to LESSON) and remove it from
 the plan queue. Run after successful reviews to auto-promote items whose
 prerequisites are now satisfied.
 """
-def process_planned_entries(user):
-    planned = PlannedEntry.objects.filter(user=user)
+def process_planned_entries(user, catalog=None):
+    if catalog is None:
+        catalog = get_catalog()
+
+    planned = list(PlannedEntry.objects.filter(user=user))
+    if not planned:
+        return
+
+    # Stages of every constituent in one query, instead of two per constituent
+    constituent_ids = {
+        c for planned_entry in planned for c in catalog.entries[planned_entry.entry_id].constituents
+    }
+    stages = dict(
+        UserDictionaryEntry.objects
+        .filter(user=user, entry_id__in=constituent_ids)
+        .values_list("entry_id", "srs_stage")
+    )
+
     for planned_entry in planned:
-        entry = planned_entry.entry
-        if all(
-            UserDictionaryEntry.objects.filter(user=user, entry=c).exists() and
-            is_gurued(UserDictionaryEntry.objects.get(user=user, entry=c))
-            for c in entry.constituents.all()
-        ):
-            ude, _ = UserDictionaryEntry.objects.get_or_create(user=user, entry=entry)
+        constituents = catalog.entries[planned_entry.entry_id].constituents
+        if all(stages.get(c) in GURUED_STAGES for c in constituents):
+            ude, _ = UserDictionaryEntry.objects.get_or_create(user=user, entry_id=planned_entry.entry_id)
             ude.unlock()
             planned_entry.delete()
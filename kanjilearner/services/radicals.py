@@ -0,0 +1,49 @@
+"""
+Kanji lookup by component radicals, from the catalog's constituents.
+
+Each radical gets a bitset (a Python int) over the catalog's kanji, in
+(level, id) order; bit i is set when kanji i has the radical as a
+constituent. A multi-radical query is the AND of those bitsets.
+"""
+from kanjilearner.constants import EntryType
+
+
+def iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class RadicalIndex:
+    def __init__(self, catalog):
+        self.kanji = [
+            entry for entry in catalog.entries.values() if entry.entry_type == EntryType.KANJI
+        ]
+        self.radical_ids = {
+            entry.id for entry in catalog.entries.values() if entry.entry_type == EntryType.RADICAL
+        }
+
+        bitsets = {}
+        for bit, kanji in enumerate(self.kanji):
+            for constituent_id in kanji.constituents:
+                if constituent_id in self.radical_ids:
+                    bitsets[constituent_id] = bitsets.get(constituent_id, 0) | (1 << bit)
+        self.bitsets = bitsets
+
+    def match(self, radical_ids):
+        """Bitset of kanji containing every radical in radical_ids."""
+        bits = (1 << len(self.kanji)) - 1
+        for radical_id in radical_ids:
+            bits &= self.bitsets.get(radical_id, 0)
+            if not bits:
+                break
+        return bits
+
+    def kanji_within(self, bits):
+        """Kanji of the bitset (from match()), in (level, id) order."""
+        return [self.kanji[bit] for bit in iter_bits(bits)]
+
+    def radicals_within(self, bits):
+        """Ids of radicals found in at least one kanji of the bitset, to narrow a query."""
+        return sorted(radical_id for radical_id, radical_bits in self.bitsets.items() if radical_bits & bits)
@@ -0,0 +1,142 @@
+"""
+Per-entry render cache for DictionaryEntrySerializer output.
+
+Everything about an entry except the requesting user's SRS state is the same
+for every user, so it is rendered once per catalog version into an
+EntryTemplate: the serialized dict plus its pre-encoded JSON bytes, with
+"holes" where per-user values go (the entry's srs_stage / next_review_at /
+unlocked and each related item's srs_stage). Responses carry RenderedEntry
+objects that fill those holes from the user_entry_map; renderers.py splices
+the pre-encoded bytes straight into the response body.
+"""
+import re
+from collections.abc import Mapping
+from rest_framework.renderers import JSONRenderer
+
+# Postgres text can't hold NUL, so catalog content never collides with these
+HOLE_TEMPLATE = "\x00{entry_id}:{field}\x00"
+HOLE_RE = re.compile("\x00(\\d+):(\\w+)\x00")
+ENCODED_HOLE_RE = re.compile(rb'"\\u0000(\d+):(\w+)\\u0000"')
+
+
+class HoleUserEntry:
+    """Stands in for a UDE while rendering a template; every attribute is a hole."""
+
+    def __init__(self, entry_id):
+        self.entry_id = entry_id
+
+    def _hole(self, field):
+        return HOLE_TEMPLATE.format(entry_id=self.entry_id, field=field)
+
+    @property
+    def srs_stage(self):
+        return self._hole("srs_stage")
+
+    @property
+    def next_review_at(self):
+        return self._hole("next_review_at")
+
+    @property
+    def is_unlocked(self):
+        return self._hole("unlocked")
+
+
+class HoleUserEntryMap:
+    """user_entry_map that returns a HoleUserEntry for any entry id."""
+
+    def get(self, entry_id, default=None):
+        return HoleUserEntry(entry_id)
+
+
+def hole_value(user_entry_map, entry_id, field):
+    ude = user_entry_map.get(entry_id)
+    if field == "srs_stage":
+        return ude.srs_stage if ude else None
+    if field == "next_review_at":
+        return ude.next_review_at if ude else None
+    if field == "unlocked":
+        return ude.is_unlocked if ude else False
+    raise ValueError(f"Unknown template field: {field}")
+
+
+class EntryTemplate:
+    """User-independent rendering of one entry, as a dict and as JSON segments."""
+
+    __slots__ = ("data", "segments", "holes")
+
+    def __init__(self, data):
+        self.data = data
+
+        # [bytes, entry_id, field, bytes, entry_id, field, ..., bytes]
+        parts = ENCODED_HOLE_RE.split(JSONRenderer().render(data))
+        self.segments = tuple(parts[0::3])
+        self.holes = tuple(
+            (int(entry_id), field.decode())
+            for entry_id, field in zip(parts[1::3], parts[2::3])
+        )
+
+    def bind(self, user_entry_map):
+        return RenderedEntry(self, user_entry_map)
+
+
+class RenderedEntry(Mapping):
+    """
+    An EntryTemplate bound to one user's entries.
+
+    Behaves like the serialized dict (built lazily, on first access), while
+    render_json() only encodes the per-user hole values.
+    """
+
+    __slots__ = ("template", "user_entry_map", "_data")
+
+    def __init__(self, template, user_entry_map):
+        self.template = template
+        self.user_entry_map = user_entry_map
+        self._data = None
+
+    def render_json(self, dumps):
+        segments = self.template.segments
+        out = [segments[0]]
+        for (entry_id, field), segment in zip(self.template.holes, segments[1:]):
+            out.append(dumps(hole_value(self.user_entry_map, entry_id, field)))
+            out.append(segment)
+        return b"".join(out)
+
+    def _fill(self, value):
+        if isinstance(value, str):
+            match = HOLE_RE.fullmatch(value)
+            if match:
+                return hole_value(self.user_entry_map, int(match[1]), match[2])
+            return value
+        if isinstance(value, dict):
+            return {key: self._fill(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._fill(item) for item in value]
+        return value
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._fill(self.template.data)
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+def get_entry_template(catalog, entry_id, render):
+    """
+    Return the cached template for entry_id, rendering it on first use.
+    Templates live on the catalog, so a new catalog version starts empty.
+    """
+    template = catalog.templates.get(entry_id)
+    if template is None:
+        template = EntryTemplate(render(HoleUserEntryMap()))
+        catalog.templates[entry_id] = template
+    return template
@@ -0,0 +1,103 @@
+"""
+Server-side review sessions.
+
+Starting a session runs the due-review query once, capped at a size and
+sorted by one of ORDERINGS, and keeps the ordered entry ids in the Django
+cache. The client then takes the queue a chunk at a time and posts answers
+against the session id, so the sort (a join on entry for "level") runs once
+per session instead of on every page load.
+
+Sessions expire SESSION_TTL after their last use. Like the user state
+stamps, they need a cache shared between workers (see CACHES in settings.py).
+Answers to a session are posted under session_lock, so retries and
+concurrent posts see each other's answers.
+"""
+import random
+import secrets
+from contextlib import contextmanager
+from django.core.cache import cache
+from django.utils import timezone
+from kanjilearner.constants import NOT_IN_REVIEWS
+from kanjilearner.models import UserDictionaryEntry
+
+SESSION_TTL = 2 * 60 * 60  # seconds
+MAX_SESSION_SIZE = 500
+LOCK_TIMEOUT = 60  # seconds; outlives any answer post, in case a worker dies holding it
+
+# order_by() for each queue ordering; "random" shuffles in Python
+ORDERINGS = {
+    "level": ("entry__level", "entry_id"),  # same as get_reviews
+    "due": ("next_review_at", "entry_id"),  # oldest first, straight off the due-review index
+    "random": None,
+}
+
+
+def _session_key(session_id):
+    return f"kanjilearner:review_session:{session_id}"
+
+
+def start_session(user, size, ordering="level", now=None):
+    """Snapshot up to size due reviews; returns (session_id, session)."""
+    due = (
+        UserDictionaryEntry.objects
+        .filter(user=user)
+        .exclude(srs_stage__in=NOT_IN_REVIEWS)
+        .filter(next_review_at__lte=now or timezone.now())
+        .values_list("entry_id", flat=True)
+    )
+    order = ORDERINGS[ordering]
+    if order is None:
+        entry_ids = list(due)
+        random.shuffle(entry_ids)
+        entry_ids = entry_ids[:size]
+    else:
+        entry_ids = list(due.order_by(*order)[:size])
+
+    session_id = secrets.token_urlsafe(16)
+    session = {"user_id": user.id, "ordering": ordering, "entry_ids": entry_ids, "answered": []}
+    cache.set(_session_key(session_id), session, SESSION_TTL)
+    return session_id, session
+
+
+def get_session(user, session_id):
+    """The user's session, or None if it expired or belongs to someone else."""
+    session = cache.get(_session_key(session_id))
+    if session is None or session["user_id"] != user.id:
+        return None
+    return session
+
+
+@contextmanager
+def session_lock(session_id):
+    """
+    Take the session's lock for the block, with cache.add so only one worker
+    gets it. Yields whether it was taken: False if another request holds it.
+    """
+    key = f"{_session_key(session_id)}:lock"
+    locked = cache.add(key, 1, LOCK_TIMEOUT)
+    try:
+        yield locked
+    finally:
+        if locked:
+            cache.delete(key)
+
+
+def next_chunk(session, limit):
+    """The first limit entry ids in the session that haven't been answered yet."""
+    answered = set(session["answered"])
+    return [entry_id for entry_id in session["entry_ids"] if entry_id not in answered][:limit]
+
+
+def record_answers(session_id, session, entry_ids):
+    """
+    Mark entry_ids answered, so later chunks skip them; renews the session's
+    TTL. Read-modify-write of the cached session: call it under session_lock,
+    on a session read after taking the lock.
+    """
+    answered = set(session["answered"]).union(entry_ids)
+    session["answered"] = [entry_id for entry_id in session["entry_ids"] if entry_id in answered]
+    cache.set(_session_key(session_id), session, SESSION_TTL)
+
+
+def remaining(session):
+    return len(session["entry_ids"]) - len(session["answered"])
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.utils import timezone
+from kanjilearner.constants import REVIEW_PROMOTIONS
+from kanjilearner.models import RecentMistake, ReviewEvent, UserDictionaryEntry, UserQueueCounts
+from kanjilearner.services.plan import process_planned_entries
+from kanjilearner.services.user_state import bump_user_state_stamp
+
+REVIEW_UPDATE_FIELDS = UserDictionaryEntry.REVIEW_FIELDS
+
+
+def apply_review_results(user, results):
+    """
+    Apply a batch of review answers, each a dict with entry_id, correct and
+    (optionally) answered_at / latency_ms, as result_success / result_failure would one by
+    one (with the same REVIEW_PROMOTIONS / SRS_DEMOTIONS transitions), in a
+    single transaction and a constant number of queries:
+
+    - SRS transitions run in memory (in answered_at order, so an entry
+      answered twice moves twice) and are written with one bulk_update
+    - The user's UserQueueCounts are updated once for the whole batch
+    - Each answer is appended to ReviewEvent with one bulk_create
+    - Recent mistakes are cleared / recorded in bulk
+    - The plan queue is re-evaluated once, if anything was promoted
+
+    Returns (outcomes, errors): the new stage of each applied answer, and
+    answers for entries the user has no UDE for.
+    """
+    now = timezone.now()
+    # answered_at in the future is clamped to now; answers without one go last
+    results = sorted(results, key=lambda result: min(result.get("answered_at") or now, now))
+    entry_ids = {result["entry_id"] for result in results}
+
+    outcomes = []
+    errors = []
+    with transaction.atomic():
+        udes = {
+            ude.entry_id: ude
+            for ude in UserDictionaryEntry.objects
+            .select_for_update()
+            .filter(user=user, entry_id__in=entry_ids)
+            .only("user", "entry", *REVIEW_UPDATE_FIELDS)
+        }
+
+        changed = {}
+        queue_before = {entry_id: ude.queue_state for entry_id, ude in udes.items()}
+        events = []
+        promoted_ids = set()
+        mistake_ids = []
+        for result in results:
+            entry_id = result["entry_id"]
+            ude = udes.get(entry_id)
+            if ude is None:
+                errors.append({"entry_id": entry_id, "error": "Entry not found or not unlocked."})
+                continue
+
+            answered_at = min(result.get("answered_at") or now, now)
+            stage_before = ude.srs_stage
+            if result["correct"]:
+                ude.promote(answered_at, save=False, promotions=REVIEW_PROMOTIONS)
+                # A correct answer clears the entry's mistakes, including earlier ones in this batch
+                promoted_ids.add(entry_id)
+                mistake_ids = [mistake_id for mistake_id in mistake_ids if mistake_id != entry_id]
+            else:
+                ude.demote(answered_at, save=False)
+                mistake_ids.append(entry_id)
+            changed[entry_id] = ude
+            events.append(ReviewEvent(
+                user=user,
+                entry_id=entry_id,
+                timestamp=answered_at,
+                correct=result["correct"],
+                stage_before=stage_before,
+                stage_after=ude.srs_stage,
+                latency_ms=result.get("latency_ms"),
+            ))
+            outcomes.append({
+                "entry_id": entry_id,
+                "correct": result["correct"],
+                "new_stage": ude.srs_stage,
+                "next_review_at": ude.next_review_at,
+            })
+
+        if changed:
+            UserDictionaryEntry.objects.bulk_update(changed.values(), REVIEW_UPDATE_FIELDS)
+            bump_user_state_stamp(user.id)  # bulk_update sends no post_save
+            UserQueueCounts.record_changes(
+                user.id, [(queue_before[entry_id], ude.queue_state) for entry_id, ude in changed.items()]
+            )
+            ReviewEvent.objects.bulk_create(events)
+        if promoted_ids:
+            RecentMistake.objects.filter(user=user, entry_id__in=promoted_ids).delete()
+        RecentMistake.record_many(user, mistake_ids)
+        if promoted_ids:
+            process_planned_entries(user)
+
+    return outcomes, errors
@@ -0,0 +1,72 @@
+"""
+Review scheduling strategies, chosen by settings.REVIEW_SCHEDULER.
+
+Each turns an SRS interval (SRS_INTERVALS) into a next_review_at. Users
+see reviews in hourly batches whichever is used: a review always lands in
+the hour ceil_to_next_hour rounds it to, and may only be moved later
+within that hour (by less than SPREAD).
+
+- "hourly": on the hour. Every user's reviews come due at :00, so clients
+  refreshing when reviews come due all hit the server at the same instant.
+- "offset": on the hour plus a fixed offset per user, derived from the
+  user id. Each user still gets one batch an hour, at their own minute.
+- "jitter": on the hour plus a random delay per review, drawn from the
+  rng passed to schedule_review (default: the random module). A user's
+  batch trickles in over the hour instead of arriving at once.
+
+The simulate_review_load command compares the request rates they produce.
+"""
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from kanjilearner.constants import SRS_INTERVALS, SRSStage
+
+SPREAD = timedelta(hours=1)
+SPREAD_SECONDS = int(SPREAD.total_seconds())
+
+
+def ceil_to_next_hour(dt):
+    """Round a datetime up to the next exact hour."""
+    if dt.minute == 0 and dt.second == 0 and dt.microsecond == 0:
+        return dt  # already aligned
+    return dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+
+def user_offset(user_id):
+    # Multiplying by a prime spreads consecutive ids evenly over the hour
+    return timedelta(seconds=(user_id * 2654435761) % SPREAD_SECONDS)
+
+
+def hourly(user_id, due, rng):
+    return ceil_to_next_hour(due)
+
+
+def offset(user_id, due, rng):
+    return ceil_to_next_hour(due) + user_offset(user_id)
+
+
+def jitter(user_id, due, rng):
+    return ceil_to_next_hour(due) + timedelta(seconds=rng.randrange(SPREAD_SECONDS))
+
+
+REVIEW_SCHEDULERS = {
+    "hourly": hourly,
+    "offset": offset,
+    "jitter": jitter,
+}
+
+
+def get_scheduler(name=None):
+    name = name or settings.REVIEW_SCHEDULER
+    try:
+        return REVIEW_SCHEDULERS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown REVIEW_SCHEDULER: {name!r}")
+
+
+def schedule_review(user_id, stage, now, scheduler=None, rng=None):
+    """next_review_at for a user's item moved to stage at now; None once BURNED."""
+    if stage == SRSStage.BURNED:
+        return None
+    return (scheduler or get_scheduler())(user_id, now + SRS_INTERVALS[stage], rng or random)
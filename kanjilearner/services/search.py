@@ -0,0 +1,114 @@
+"""
+Search backends for the search view, chosen by settings.SEARCH_BACKEND.
+
+- "catalog": case-insensitive substring scan over the in-memory catalog
+  (services/catalog.py), ordered by (level, id).
+- "trigram": the same substring match in Postgres, served by the pg_trgm GIN
+  indexes on DictionaryEntry (literal, meaning and the flattened
+  search_readings column), ranked by trigram word similarity, then level.
+  Keeps latency flat as the catalog grows past what a scan handles well.
+- "index": the in-memory inverted n-gram index (services/search_index.py),
+  with kana/romaji normalization; no database work at all.
+
+All return CatalogEntry objects from the given catalog, as a list or (trigram)
+a sequence that the paginator slices in SQL.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+from kanjilearner.models import DictionaryEntry, normalize_search_text
+from kanjilearner.services.catalog import get_catalog
+
+
+def catalog_search(catalog, query):
+    return catalog.search(query)
+
+
+class TrigramResults:
+    """
+    trigram_search's ranked matches, read a page at a time. The paginator's
+    count() and page slice run as a COUNT(*) and a LIMIT / OFFSET query, so
+    only the ids on the requested page are loaded, however many match.
+    """
+
+    def __init__(self, catalog, entry_ids):
+        self.catalog = catalog
+        self.entry_ids = entry_ids
+
+    def entries(self, entry_ids):
+        # The catalog may trail the table by one edit; skip entries it doesn't have yet
+        return [self.catalog.entries[entry_id] for entry_id in entry_ids if entry_id in self.catalog.entries]
+
+    def count(self):
+        return self.entry_ids.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.entries(self.entry_ids[index])
+        return self[index:index + 1][0]
+
+    def __iter__(self):
+        return iter(self.entries(self.entry_ids))
+
+
+def trigram_search(catalog, query):
+    normalized = normalize_search_text(query)
+    similarity = Greatest(
+        TrigramWordSimilarity(query.upper(), Upper("literal")),
+        TrigramWordSimilarity(normalized.upper(), Upper("meaning")),
+        TrigramWordSimilarity(normalized, "search_readings"),
+    )
+    entry_ids = (
+        DictionaryEntry.objects
+        .filter(
+            Q(literal__icontains=query)
+            | Q(meaning__icontains=normalized)
+            | Q(search_readings__contains=normalized)
+        )
+        .annotate(similarity=similarity)
+        .order_by("-similarity", "level", "id")
+        .values_list("id", flat=True)
+    )
+    return TrigramResults(catalog, entry_ids)
+
+
+def index_search(catalog, query):
+    return catalog.search_index.search(query)
+
+
+SEARCH_BACKENDS = {
+    "catalog": catalog_search,
+    "trigram": trigram_search,
+    "index": index_search,
+}
+
+
+def search_entries(catalog, query):
+    try:
+        backend = SEARCH_BACKENDS[settings.SEARCH_BACKEND]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown SEARCH_BACKEND: {settings.SEARCH_BACKEND!r}")
+    return backend(catalog, query)
+
+
+def iter_search_entries(catalog, query, after=None):
+    """
+    (position, entry) matches in (level, id) order past the key `after`, for
+    keyset pages. Trigram results are ranked, not ordered, so that backend
+    pages with the catalog scan.
+    """
+    if settings.SEARCH_BACKEND == "index":
+        return catalog.search_index.iter_search(query, after)
+    return catalog.iter_search(query, after)
+
+
+def warm_up():
+    """Load this worker's catalog (and its search index, if used) ahead of requests."""
+    catalog = get_catalog()
+    if settings.SEARCH_BACKEND == "index":
+        catalog.search_index
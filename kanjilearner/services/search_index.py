@@ -0,0 +1,182 @@
+"""
+In-memory search structures over one catalog version: the inverted index
+behind the "index" search backend (services/search.py), and the Typeahead
+prefix lookup behind the typeahead endpoint.
+
+- Literals and readings are indexed by character unigrams and bigrams,
+  after normalize_kana(), so katakana, hiragana, full-width and half-width
+  input all hit the same postings; queries that are entirely romaji
+  ("taberu", not "dog") are also looked up as kana
+- Meanings are indexed by word tokens; each query word matches any meaning
+  word it is a prefix of (typeahead: "eat" finds "to eat", "eating")
+
+Postings are sorted catalog positions, so results come out in (level, id)
+order without sorting entries.
+"""
+import bisect
+import re
+from collections import defaultdict
+from kanjilearner.models import normalize_search_text
+from kanjilearner.services.kana import normalize_kana, romaji_to_hiragana
+
+WORD_RE = re.compile(r"\w+")
+ROMAJI_CONSONANTS = "bcdfghjkmprstvwyz"
+
+
+def romaji_as_kana(normalized, partial=False):
+    """
+    normalized (after normalize_kana) as hiragana if all of it is romaji,
+    else None. partial=True also drops a trailing, not yet finished
+    syllable ("tab" → た), for completing as the user types.
+    """
+    if partial:
+        normalized = normalized.rstrip(ROMAJI_CONSONANTS)
+    return romaji_to_hiragana(normalized)
+
+
+def character_grams(text):
+    return {*text, *(text[i:i + 2] for i in range(len(text) - 1))}
+
+
+def meaning_tokens(text):
+    return WORD_RE.findall(normalize_search_text(text))
+
+
+class SearchIndex:
+    def __init__(self, catalog):
+        self.entries = list(catalog.entries.values())
+        self.position_after = catalog.position_after
+
+        # Per position: normalized literal and readings, to verify gram matches
+        self.kana_fields = []
+        grams = defaultdict(list)
+        tokens = defaultdict(list)
+        for position, entry in enumerate(self.entries):
+            fields = tuple(
+                normalize_kana(field)
+                for field in (entry.literal, entry.reading, *entry.kunyomi_readings, *entry.onyomi_readings)
+                if field
+            )
+            self.kana_fields.append(fields)
+            for gram in set().union(*map(character_grams, fields)):
+                grams[gram].append(position)
+            for token in set(meaning_tokens(entry.meaning)):
+                tokens[token].append(position)
+
+        self.grams = dict(grams)
+        self.tokens = dict(tokens)
+        self.sorted_tokens = sorted(tokens)
+
+    def search(self, query):
+        """Matching catalog entries, in (level, id) order."""
+        return [self.entries[position] for position in self.search_positions(query)]
+
+    def iter_search(self, query, after=None):
+        """Same contract as Catalog.iter_search: (position, entry) past key `after`."""
+        positions = self.search_positions(query)
+        start = bisect.bisect_left(positions, self.position_after(after))
+        for position in positions[start:]:
+            yield position, self.entries[position]
+
+    def search_positions(self, query):
+        normalized = normalize_kana(query.strip())
+        if not normalized:
+            return []
+
+        matches = self.kana_matches(normalized)
+        kana = romaji_as_kana(normalized)
+        if kana:
+            matches |= self.kana_matches(kana)
+        matches |= self.meaning_matches(normalized)
+        return sorted(matches)
+
+    def kana_matches(self, text):
+        """Positions whose literal or a reading contains text."""
+        grams = {text} if len(text) == 1 else {text[i:i + 2] for i in range(len(text) - 1)}
+        candidates = self.intersect(self.grams.get(gram, ()) for gram in grams)
+        # Every bigram present doesn't mean they're adjacent: check the substring
+        return {
+            position for position in candidates
+            if any(text in field for field in self.kana_fields[position])
+        }
+
+    def meaning_matches(self, text):
+        """Positions whose meaning has a word starting with each word of text."""
+        words = meaning_tokens(text)
+        if not words:
+            return set()
+        return self.intersect(self.prefix_postings(word) for word in words)
+
+    def prefix_postings(self, prefix):
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        positions = set()
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            positions.update(self.tokens[token])
+        return positions
+
+    @staticmethod
+    def intersect(postings):
+        result = None
+        for posting in sorted(postings, key=len):
+            result = set(posting) if result is None else result.intersection(posting)
+            if not result:
+                return set()
+        return result or set()
+
+
+class Typeahead:
+    """
+    Sorted (key, position) pairs for prefix lookups. Keys are normalized
+    literals, readings, whole meanings ("to eat") and meaning words ("eat").
+    A lookup is one bisect plus a scan of at most `limit` distinct entries.
+    """
+
+    def __init__(self, catalog):
+        self.entries = list(catalog.entries.values())
+
+        pairs = set()
+        for position, entry in enumerate(self.entries):
+            keys = {
+                normalize_kana(field)
+                for field in (entry.literal, entry.reading, *entry.kunyomi_readings, *entry.onyomi_readings)
+            }
+            meaning = normalize_search_text(entry.meaning)
+            keys.update(part.strip() for part in meaning.split(","))
+            keys.update(meaning_tokens(meaning))
+            pairs.update((key, position) for key in keys if key)
+
+        # By key, then (level, id): "rain" before "rainbow", lower levels first
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.positions = [position for _, position in pairs]
+
+    def complete(self, query, limit=10):
+        """
+        Up to limit entries with a key starting with query, then with its
+        romaji as kana. A query ending in an unfinished syllable ("tab") is
+        only looked up as kana (た) if nothing starts with it as typed, so
+        English words ("dog") don't fill up with kana fragments (ど).
+        """
+        normalized = normalize_kana(query.strip())
+        if not normalized:
+            return []
+
+        seen = set()
+        results = []
+        self.collect(normalized, limit, seen, results)
+        kana = romaji_as_kana(normalized) or (not results and romaji_as_kana(normalized, partial=True))
+        if kana:
+            self.collect(kana, limit, seen, results)
+        return results
+
+    def collect(self, prefix, limit, seen, results):
+        """Append entries with a key starting with prefix to results, up to limit."""
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(results) < limit and self.keys[i].startswith(prefix):
+            position = self.positions[i]
+            if position not in seen:
+                seen.add(position)
+                results.append(self.entries[position])
+            i += 1
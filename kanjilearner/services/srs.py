@@ -0,0 +1,107 @@
+"""
+Database-side SRS transitions.
+
+Each review is one UPDATE ... RETURNING: the stage mapping (REVIEW_PROMOTIONS or
+SRS_DEMOTIONS) becomes a SQL CASE on the row's current srs_stage, and the
+next review time for each target stage (SRS_INTERVALS, placed in its hour
+by the review scheduler, services/scheduling.py) is computed up front and
+passed in the same CASE. The row is read and written by the same statement, so two tabs
+answering at once apply one after the other instead of losing an update,
+and only srs_stage / next_review_at / last_reviewed_at are written. The
+answer itself is appended to ReviewEvent, and the user's UserQueueCounts
+updated, in the same transaction.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from kanjilearner.constants import REVIEW_PROMOTIONS, SRS_DEMOTIONS
+from kanjilearner.models import ReviewEvent, UserDictionaryEntry, UserQueueCounts
+from kanjilearner.services.scheduling import get_scheduler, schedule_review
+from kanjilearner.services.user_state import bump_user_state_stamp
+
+
+def transition_sql(mapping, now, user_id, entry_id):
+    """
+    SQL and params for moving one UDE along mapping (old stage → new stage).
+    The locked subquery lets RETURNING report the stage and next review
+    time before the change.
+    """
+    qn = connection.ops.quote_name
+    table = qn(UserDictionaryEntry._meta.db_table)
+    stage, review_at = qn("srs_stage"), qn("next_review_at")
+    before = f"{qn('before')}.{stage}"
+    review_before = f"{qn('before')}.{review_at}"
+
+    scheduler = get_scheduler()
+    stage_cases, review_cases = [], []
+    stage_params, review_params = [], []
+    for old, new in mapping.items():
+        stage_cases.append("WHEN %s THEN %s")
+        stage_params += [old.value, new.value]
+        review_cases.append("WHEN %s THEN CAST(%s AS timestamp with time zone)")
+        review_params += [old.value, schedule_review(user_id, new, now, scheduler)]
+
+    sql = (
+        f"UPDATE {table} "
+        f"SET {stage} = CASE {before} {' '.join(stage_cases)} END, "
+        f"{review_at} = CASE {before} {' '.join(review_cases)} END, "
+        f"{qn('last_reviewed_at')} = %s "
+        f"FROM (SELECT {qn('id')}, {stage}, {review_at} FROM {table} "
+        f"WHERE {qn('user_id')} = %s AND {qn('entry_id')} = %s "
+        f"AND {stage} IN ({', '.join(['%s'] * len(mapping))}) FOR UPDATE) AS {qn('before')} "
+        f"WHERE {table}.{qn('id')} = {qn('before')}.{qn('id')} "
+        f"RETURNING {before}, {review_before}, {table}.{stage}, {table}.{review_at}"
+    )
+    params = [
+        *stage_params,
+        *review_params,
+        now,
+        user_id,
+        entry_id,
+        *(old.value for old in mapping),
+    ]
+    return sql, params
+
+
+def apply_review(user, entry_id, correct, now=None, latency_ms=None):
+    """
+    Promote (correct) or demote the user's UDE for entry_id in one statement,
+    and append the answer to ReviewEvent. Returns (srs_stage, next_review_at)
+    after the answer, unchanged for stages reviews don't move (BURNED,
+    LOCKED, ...), or None if the user has no UDE for the entry.
+    """
+    now = now or timezone.now()
+    mapping = REVIEW_PROMOTIONS if correct else SRS_DEMOTIONS
+    sql, params = transition_sql(mapping, now, user.id, entry_id)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        if row is not None:
+            stage_before, review_before, stage_after, review_at = row
+            bump_user_state_stamp(user.id)  # raw UPDATE sends no post_save
+            UserQueueCounts.record_changes(
+                user.id, [((stage_before, review_before), (stage_after, review_at))]
+            )
+        else:
+            current = (
+                UserDictionaryEntry.objects
+                .filter(user=user, entry_id=entry_id)
+                .values_list("srs_stage", "next_review_at")
+                .first()
+            )
+            if current is None:
+                return None
+            stage_before, review_at = current
+            stage_after = stage_before
+
+        ReviewEvent.objects.create(
+            user=user,
+            entry_id=entry_id,
+            timestamp=now,
+            correct=correct,
+            stage_before=stage_before,
+            stage_after=stage_after,
+            latency_ms=latency_ms,
+        )
+    return stage_after, review_at
@@ -0,0 +1,33 @@
+"""
+Per-user cache of data derived only from the user's SRS stages (the
+dashboard item spread).
+
+Unlike the state stamps in user_state.py, which change on any UDE write,
+these entries are only dropped when one of the user's stages changes:
+every SRS transition goes through UserQueueCounts.record_changes, which
+calls invalidate_stage_cache. Writes that bypass it (admin edits, raw
+updates) are covered by STAGE_CACHE_TTL.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+STAGE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+
+def _item_spread_key(user_id):
+    return f"kanjilearner:item_spread:{user_id}"
+
+
+def get_item_spread(user_id):
+    return cache.get(_item_spread_key(user_id))
+
+
+def set_item_spread(user_id, spread):
+    cache.set(_item_spread_key(user_id), spread, STAGE_CACHE_TTL)
+
+
+def invalidate_stage_cache(user_id):
+    key = _item_spread_key(user_id)
+    cache.delete(key)
+    # Again once committed, in case a request cached the pre-commit stages meanwhile
+    transaction.on_commit(lambda: cache.delete(key))
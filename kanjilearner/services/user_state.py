@@ -0,0 +1,41 @@
+"""
+Per-user state stamps for conditional GETs.
+
+Responses like entry_detail and search mix catalog data with the user's SRS
+state (their UDEs and planned entries). Each user has a stamp in the Django
+cache that is bumped whenever that state changes (see signals.py), so an
+ETag can be computed and checked without querying any user state.
+
+If a stamp is evicted, a fresh one is issued: clients just miss once.
+The cache must be shared between workers (see CACHES in settings.py).
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _stamp_key(user_id):
+    return f"kanjilearner:user_state:{user_id}"
+
+
+def get_user_state_stamp(user_id) -> int:
+    """Nanosecond timestamp of the user's last state change (or of first use)."""
+    key = _stamp_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def bump_user_state_stamp(user_id):
+    key = _stamp_key(user_id)
+    cache.set(key, time.time_ns(), timeout=None)
+    # Bump again once committed, so a response rendered from the pre-commit
+    # state can't end up tagged with the new stamp
+    transaction.on_commit(lambda: cache.set(key, time.time_ns(), timeout=None))
+
+
+def stamp_to_datetime(stamp) -> datetime:
+    return datetime.fromtimestamp(stamp / 1e9, tz=dt_timezone.utc)
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import UserDictionaryEntry, DictionaryEntry
+from .models import PlannedEntry, UserDictionaryEntry, DictionaryEntry
 from django.utils import timezone
+from .services.catalog import RELATION_FIELDS, bump_catalog_version
+from .services.user_state import bump_user_state_stamp
 from .utils import initialize_user_dictionary_entries
 
 User = get_user_model()
@@ -10,4 +12,34 @@ User = get_user_model()
 @receiver(post_save, sender=User)
 def create_user_dictionary_entries(sender, instance, created, **kwargs):
     if created:
-        initialize_user_dictionary_entries(instance)
\ No newline at end of file
+        initialize_user_dictionary_entries(instance)
+
+
+@receiver(pre_save, sender=DictionaryEntry)
+def sync_search_readings(sender, instance, **kwargs):
+    # Also runs for loaddata (raw saves), unlike an overridden save()
+    instance.search_readings = instance.build_search_readings()
+
+
+@receiver([post_save, post_delete], sender=DictionaryEntry)
+def dictionary_entry_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+def dictionary_relations_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalog_version()
+
+
+for relation in RELATION_FIELDS:
+    m2m_changed.connect(
+        dictionary_relations_changed,
+        sender=getattr(DictionaryEntry, relation).through,
+        dispatch_uid=f"catalog_{relation}_changed",
+    )
+
+
+@receiver([post_save, post_delete], sender=UserDictionaryEntry)
+@receiver([post_save, post_delete], sender=PlannedEntry)
+def user_state_changed(sender, instance, **kwargs):
+    bump_user_state_stamp(instance.user_id)
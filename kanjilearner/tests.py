@@ -1,13 +1,31 @@
+import gzip
+import io
 import json
-from django.test import TestCase
+import msgpack
+import os
+import random
+import tempfile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
-from kanjilearner.models import DictionaryEntry, RecentMistake, UserDictionaryEntry, PlannedEntry
+from kanjilearner.models import (
+    CatalogVersion, DictionaryEntry, RecentMistake, ReviewEvent, UserDictionaryEntry, UserQueueCounts, PlannedEntry,
+)
 from .utils import initialize_user_dictionary_entries  # adjust if in another module
-from kanjilearner.constants import SRSStage, SRS_INTERVALS, EntryType
+from kanjilearner.constants import NOT_IN_REVIEWS, SRSStage, SRS_INTERVALS, EntryType
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
 from kanjilearner.services.plan import plan_entry, process_planned_entries
+from kanjilearner.services.catalog import get_catalog
+from kanjilearner.services import review_sessions
+from kanjilearner.services.kana import normalize_kana, romaji_to_hiragana
+from kanjilearner.services.scheduling import SPREAD, ceil_to_next_hour, jitter, schedule_review, user_offset
+from kanjilearner.services.search import trigram_search
 
 # Use the correct user model (default or custom)
 User = get_user_model()
@@ -42,7 +60,6 @@ class UserDictionaryEntryTests(TestCase):
             srs_stage=SRSStage.GURU_2,
             last_reviewed_at=timezone.now(),
             next_review_at=timezone.now() + SRS_INTERVALS[SRSStage.GURU_2],
-            review_history=[],
         )
 
         # Kanji unlocked, review is due
@@ -53,14 +70,12 @@ class UserDictionaryEntryTests(TestCase):
             srs_stage=SRSStage.APPRENTICE_1,
             last_reviewed_at=timezone.now() - timedelta(hours=5),
             next_review_at=timezone.now() - timedelta(hours=1),
-            review_history=[],
         )
 
         # Vocab still locked
         UserDictionaryEntry.objects.create(
             user=self.user,
             entry=self.vocab,
-            review_history=[],
         )
 
     def test_pending_reviews_helper(self):
@@ -111,9 +126,8 @@ class InitializeUserDictionaryEntriesTest(TestCase):
             self.assertEqual(user_entry.srs_stage, SRSStage.LOCKED.value)
             self.assertIsNone(user_entry.unlocked_at)
 
-        # Review history should be empty for all
-        for ue in user_entries:
-            self.assertEqual(ue.review_history, [])
+        # No review history yet
+        self.assertFalse(ReviewEvent.objects.filter(user=self.user).exists())
 
 
 class DictionarySearchTests(TestCase):
@@ -191,6 +205,33 @@ class DictionarySearchTests(TestCase):
         self.assertEqual(resp.status_code, 400)
         self.assertIn("error", resp.data)
 
+    def test_cursor_pages_follow_level_id_order(self):
+        for level in (1, 5, 5, 7):
+            DictionaryEntry.objects.create(
+                entry_type=EntryType.VOCAB, literal=f"語{level}", meaning="word", level=level,
+            )
+        expected = list(
+            DictionaryEntry.objects.filter(meaning="word").order_by("level", "id").values_list("id", flat=True)
+        )
+
+        # A page that reaches the end of the catalog has scanned it all: the total is exact
+        resp = self.client.get(reverse("search"), {"q": "word", "cursor": "", "total": 1})
+        self.assertEqual(resp.data["approximate_total"], 4)
+
+        seen = []
+        resp = self.client.get(reverse("search"), {"q": "word", "cursor": "", "page_size": 3})
+        while True:
+            self.assertNotIn("count", resp.data)
+            seen += [result["entry"]["id"] for result in resp.data["results"]]
+            if resp.data["next"] is None:
+                break
+            resp = self.client.get(resp.data["next"])
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(reverse("search"), {"q": "rain", "cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 404)
+
 
 class EntryDetailViewTests(TestCase):
     def setUp(self):
@@ -330,7 +371,7 @@ class PlannedEntriesAPITests(TestCase):
 
         # Give user UDE for kanji1
         self.ude1 = UserDictionaryEntry.objects.create(
-            user=self.user, entry=self.kanji1, srs_stage=SRSStage.LOCKED, review_history=[]
+            user=self.user, entry=self.kanji1, srs_stage=SRSStage.LOCKED
         )
 
         # Plan kanji1 for current user
@@ -521,9 +562,16 @@ class ReviewForecastAPITest(TestCase):
 
     def make_ude(self, srs_stage=SRSStage.APPRENTICE_1, delta_hours=1):
         """Helper to create a UserDictionaryEntry with a scheduled review in delta_hours."""
+        # One UDE per (user, entry), so each review gets its own entry
+        entry = DictionaryEntry.objects.create(
+            entry_type=EntryType.KANJI,
+            literal=self.entry.literal,
+            meaning=self.entry.meaning,
+            level=1,
+        )
         return UserDictionaryEntry.objects.create(
             user=self.user,
-            entry=self.entry,
+            entry=entry,
             srs_stage=srs_stage,
             next_review_at=timezone.now() + timedelta(hours=delta_hours),
         )
@@ -616,6 +664,29 @@ class ReviewForecastAPITest(TestCase):
         total_counts = sum(hour["count"] for day in data.values() for hour in day.values())
         self.assertEqual(total_counts, 1)
     
+    def test_bucketed_in_sql_and_cached_for_the_hour(self):
+        self.make_ude(delta_hours=1)
+        self.make_ude(delta_hours=1)
+        self.make_ude(delta_hours=30)
+        UserQueueCounts.rebuild(self.user.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(self.url("Asia/Kolkata")).json()
+        ude_queries = [q["sql"] for q in queries if "kanjilearner_userdictionaryentry" in q["sql"]]
+        self.assertEqual(len(ude_queries), 1)
+        self.assertIn("DATE_TRUNC", ude_queries[0])
+        self.assertIn("GROUP BY", ude_queries[0])
+        self.assertEqual(sum(h["count"] for day in data.values() for h in day.values()), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url("Asia/Kolkata")).json(), data)
+        self.assertFalse([q for q in queries if "kanjilearner_userdictionaryentry" in q["sql"]])
+
+        # A review write changes the user's state stamp, so the next call recomputes
+        self.make_ude(delta_hours=2)
+        data = self.client.get(self.url("Asia/Kolkata")).json()
+        self.assertEqual(sum(h["count"] for day in data.values() for h in day.values()), 4)
+
     def test_each_day_has_24_hours(self):
         # Add one review today
         self.make_ude(delta_hours=1)
@@ -734,7 +805,7 @@ class RecentMistakesAPITest(TestCase):
     def url(self):
         return reverse("get_recent_mistakes")
 
-    def test_old_mistakes_purged(self):
+    def test_old_mistakes_hidden(self):
         # First add a mistake normally
         UserDictionaryEntry.record_recent_mistake(self.user, self.entry)
         old_mistake = RecentMistake.objects.filter(user=self.user).latest("timestamp")
@@ -747,16 +818,29 @@ class RecentMistakesAPITest(TestCase):
         # Add a fresh mistake at current time
         UserDictionaryEntry.record_recent_mistake(self.user, self.entry)
 
-        # Call API to trigger purge
         resp = self.client.get(self.url())
         data = resp.json()
 
         # Should only return the fresh one
         self.assertEqual(len(data), 1)
 
-        # And the DB should also only contain 1 record
+        # Reads don't delete: the expired row stays until the cap pushes it out
         remaining = RecentMistake.objects.filter(user=self.user)
-        self.assertEqual(remaining.count(), 1)
+        self.assertEqual(remaining.count(), 2)
+
+    def test_one_statement_per_mistake(self):
+        for i in range(RecentMistake.MAX_PER_USER):
+            UserDictionaryEntry.record_recent_mistake(self.user, self.entry)
+        newest = RecentMistake.objects.filter(user=self.user).order_by("-id").first()
+
+        with CaptureQueriesContext(connection) as queries:
+            RecentMistake.record_many(self.user, [self.entry.id] * 3)
+        self.assertEqual(len(queries), 1)
+
+        remaining = RecentMistake.objects.filter(user=self.user).order_by("-id")
+        self.assertEqual(remaining.count(), RecentMistake.MAX_PER_USER)
+        # The three new rows, then the newest old ones
+        self.assertEqual(remaining[3].id, newest.id)
 
     def test_max_50_retained(self):
         # Insert 55 mistakes
@@ -930,3 +1014,1298 @@ class ItemSpreadAPITest(TestCase):
         self.assertEqual(total_count, 3)
 
 
+
+
+class BatchedLoadingQueryCountTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⼝", meaning="mouth", entry_type=EntryType.RADICAL, level=1
+        )
+        self.similar = DictionaryEntry.objects.create(
+            literal="⼞", meaning="enclosure", entry_type=EntryType.RADICAL, level=1
+        )
+
+    def make_entries(self, n, srs_stage, next_review_at=None):
+        for i in range(n):
+            kanji = DictionaryEntry.objects.create(
+                literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=2
+            )
+            kanji.constituents.add(self.radical)
+            kanji.visually_similar.add(self.similar)
+            self.radical.used_in.add(kanji)
+            UserDictionaryEntry.objects.create(
+                user=self.user, entry=kanji, srs_stage=srs_stage, next_review_at=next_review_at
+            )
+            if i % 2 == 0:
+                PlannedEntry.objects.create(user=self.user, entry=kanji)
+
+    def test_reviews_query_count_constant(self):
+        self.make_entries(10, SRSStage.APPRENTICE_1, timezone.now() - timedelta(hours=1))
+        get_catalog()  # warm this worker's catalog
+
+        # session + user + catalog version + UDEs + related UDEs + planned ids
+        with self.assertNumQueries(6):
+            resp = self.client.get(reverse("get_reviews"))
+
+        self.assertEqual(len(resp.data), 10)
+        for item in resp.data:
+            self.assertEqual(item["entry"]["constituents"][0]["literal"], "⼝")
+            self.assertEqual(item["entry"]["visually_similar"][0]["literal"], "⼞")
+        self.assertEqual(sum(item["in_plan"] for item in resp.data), 5)
+
+    def test_lessons_query_count_constant(self):
+        self.make_entries(10, SRSStage.LESSON)
+        get_catalog()
+
+        with self.assertNumQueries(6):
+            resp = self.client.get(reverse("get_lessons"))
+
+        self.assertEqual(len(resp.data), 10)
+
+    def test_nested_entries_carry_user_state(self):
+        self.make_entries(2, SRSStage.APPRENTICE_1, timezone.now() - timedelta(hours=1))
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.radical, srs_stage=SRSStage.GURU_1
+        )
+
+        resp = self.client.get(reverse("get_reviews"))
+
+        for item in resp.data:
+            entry = item["entry"]
+            self.assertEqual(entry["srs_stage"], SRSStage.APPRENTICE_1)
+            self.assertTrue(entry["unlocked"])
+            self.assertIsNotNone(entry["next_review_at"])
+            self.assertEqual(entry["constituents"][0]["srs_stage"], SRSStage.GURU_1)
+            # No UDE for the similar radical yet
+            self.assertIsNone(entry["visually_similar"][0]["srs_stage"])
+
+        radical_resp = self.client.get(reverse("entry_detail", args=[self.radical.pk]))
+        used_in = radical_resp.data["entry"]["used_in"]
+        self.assertEqual(len(used_in), 2)
+        self.assertTrue(all(u["srs_stage"] == SRSStage.APPRENTICE_1 for u in used_in))
+
+    def test_review_cards_are_compact(self):
+        self.make_entries(10, SRSStage.APPRENTICE_1, timezone.now() - timedelta(hours=1))
+        get_catalog()
+
+        # session + user + catalog version + UDEs; no related UDEs or planned ids
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("get_reviews"), {"view": "card"})
+        self.assertEqual(len(queries), 4)
+        self.assertNotIn("user_sentences", queries[-1]["sql"])
+
+        self.assertEqual(len(resp.data), 10)
+        card = resp.data[0]
+        self.assertEqual(set(card), {"entry", "srs_stage"})
+        self.assertEqual(card["entry"]["literal"], "K0")
+        self.assertNotIn("constituents", card["entry"])
+        self.assertNotIn("meaning_mnemonic", card["entry"])
+
+    def test_full_reviews_skip_unrendered_columns(self):
+        self.make_entries(2, SRSStage.APPRENTICE_1, timezone.now() - timedelta(hours=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("get_reviews"))
+        ude_queries = [q["sql"] for q in queries if "kanjilearner_userdictionaryentry" in q["sql"]]
+        self.assertTrue(ude_queries)
+        self.assertFalse(any("user_sentences" in sql for sql in ude_queries))
+
+
+class BulkGetOrCreateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.entries = [
+            DictionaryEntry.objects.create(
+                literal=f"語{i}", meaning=f"word {i}", entry_type=EntryType.VOCAB, level=1
+            )
+            for i in range(6)
+        ]
+        # Half the entries already have a UDE
+        for entry in self.entries[::2]:
+            UserDictionaryEntry.objects.create(user=self.user, entry=entry, srs_stage=SRSStage.GURU_1)
+
+    def test_creates_missing_and_keeps_order(self):
+        with self.assertNumQueries(3):
+            udes = UserDictionaryEntry.bulk_get_or_create(self.user, self.entries)
+
+        self.assertEqual([ude.entry_id for ude in udes], [e.id for e in self.entries])
+        self.assertEqual(UserDictionaryEntry.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(udes[0].srs_stage, SRSStage.GURU_1)
+        self.assertEqual(udes[1].srs_stage, SRSStage.LOCKED)
+
+        # Everything exists now → a single SELECT
+        with self.assertNumQueries(1):
+            UserDictionaryEntry.bulk_get_or_create(self.user, self.entries)
+
+    def test_unique_user_entry(self):
+        with self.assertRaises(IntegrityError):
+            UserDictionaryEntry.objects.create(user=self.user, entry=self.entries[0])
+
+    def test_search_query_count_constant(self):
+        get_catalog()
+
+        # session + user + catalog version + existing UDEs + insert + inserted UDEs + planned ids
+        with self.assertNumQueries(7):
+            resp = self.client.get(reverse("search"), {"q": "word"})
+
+        self.assertEqual(len(resp.data["results"]), 6)
+        self.assertEqual(UserDictionaryEntry.objects.filter(user=self.user).count(), 6)
+
+
+class CatalogCacheTest(TestCase):
+    def setUp(self):
+        self.radical = DictionaryEntry.objects.create(
+            literal="⽊", meaning="tree", entry_type=EntryType.RADICAL, level=1
+        )
+        self.kanji = DictionaryEntry.objects.create(
+            literal="林", meaning="grove", entry_type=EntryType.KANJI, level=2,
+            kunyomi_readings=["はやし"], onyomi_readings=["リン"],
+        )
+
+    def test_reused_until_catalog_changes(self):
+        catalog = get_catalog()
+        self.assertIs(get_catalog(), catalog)
+        self.assertEqual(catalog.get(self.kanji.id).kunyomi_readings, ("はやし",))
+
+        self.kanji.meaning = "woods"
+        self.kanji.save()
+        self.assertEqual(get_catalog().get(self.kanji.id).meaning, "woods")
+
+    def test_m2m_changes_invalidate(self):
+        get_catalog()
+        self.kanji.constituents.add(self.radical)
+        self.radical.used_in.add(self.kanji)
+
+        catalog = get_catalog()
+        self.assertEqual(catalog.get(self.kanji.id).constituents, (self.radical.id,))
+        self.assertEqual(catalog.get(self.radical.id).used_in, (self.kanji.id,))
+
+        self.kanji.constituents.clear()
+        self.assertEqual(get_catalog().get(self.kanji.id).constituents, ())
+
+    def test_reloads_when_another_worker_bumps_version(self):
+        catalog = get_catalog()
+
+        # Simulate an edit made through another process: no local invalidation
+        DictionaryEntry.objects.filter(id=self.kanji.id).update(meaning="forest")
+        CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1)
+
+        reloaded = get_catalog()
+        self.assertIsNot(reloaded, catalog)
+        self.assertEqual(reloaded.get(self.kanji.id).meaning, "forest")
+
+    def test_search(self):
+        catalog = get_catalog()
+        self.assertEqual([e.id for e in catalog.search("リン")], [self.kanji.id])
+        self.assertEqual([e.id for e in catalog.search("TREE")], [self.radical.id])
+        self.assertEqual(catalog.search("banana"), [])
+
+
+class EntryRenderCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.other_user = User.objects.create_user(username="otheruser", password="pw")
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⽇", meaning="sun", entry_type=EntryType.RADICAL, level=1
+        )
+        self.kanji = DictionaryEntry.objects.create(
+            literal="明", meaning="bright", entry_type=EntryType.KANJI, level=2,
+            onyomi_readings=["メイ"], meaning_mnemonic="Sun and moon   together",
+        )
+        self.kanji.constituents.add(self.radical)
+        self.radical.used_in.add(self.kanji)
+
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.kanji, srs_stage=SRSStage.APPRENTICE_2,
+            next_review_at=timezone.now() - timedelta(hours=1),
+        )
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.radical, srs_stage=SRSStage.GURU_1,
+        )
+        UserDictionaryEntry.objects.create(
+            user=self.other_user, entry=self.kanji, srs_stage=SRSStage.MASTER,
+            next_review_at=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_spliced_json_matches_plain_renderer(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("get_reviews"))
+
+        plain = JSONRenderer().render(resp.data)
+        self.assertEqual(resp.content, plain)
+        self.assertEqual(resp.json()[0]["entry"]["constituents"][0]["srs_stage"], SRSStage.GURU_1)
+
+    def test_template_shared_between_users(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("get_reviews"))
+        template = get_catalog().templates[self.kanji.id]
+
+        self.client.force_login(self.other_user)
+        resp = self.client.get(reverse("get_reviews"))
+
+        self.assertIs(get_catalog().templates[self.kanji.id], template)
+        entry = resp.json()[0]["entry"]
+        self.assertEqual(entry["srs_stage"], SRSStage.MASTER)
+        self.assertIsNone(entry["constituents"][0]["srs_stage"])
+
+    def test_template_refreshed_when_related_entry_changes(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("get_reviews"))
+
+        self.radical.meaning = "day"
+        self.radical.save()
+
+        resp = self.client.get(reverse("get_reviews"))
+        self.assertEqual(resp.json()[0]["entry"]["constituents"][0]["meaning"], "day")
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⽔", meaning="water", entry_type=EntryType.RADICAL, level=1
+        )
+        self.kanji = DictionaryEntry.objects.create(
+            literal="泳", meaning="swim", entry_type=EntryType.KANJI, level=3
+        )
+        self.kanji.constituents.add(self.radical)
+        self.url = reverse("entry_detail", args=[self.kanji.pk])
+
+    def test_entry_detail_not_modified(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("Last-Modified", resp)
+        self.assertIn("no-cache", resp["Cache-Control"])
+        etag = resp["ETag"]
+
+        # session + user + catalog version; no serialization or user-state queries
+        with self.assertNumQueries(3):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_user_state_change_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        # The radical is a constituent, so its stage is part of the kanji's detail
+        UserDictionaryEntry.objects.create(user=self.user, entry=self.radical, srs_stage=SRSStage.LESSON)
+
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["entry"]["constituents"][0]["srs_stage"], SRSStage.LESSON)
+
+    def test_catalog_change_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.radical.meaning = "river"
+        self.radical.save()
+
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["entry"]["constituents"][0]["meaning"], "river")
+
+    def test_search_not_modified_per_query(self):
+        url = reverse("search")
+        etag = self.client.get(url, {"q": "swim"})["ETag"]
+
+        resp = self.client.get(url, {"q": "swim"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(url, {"q": "water"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_entry_catalog_is_public_and_user_independent(self):
+        url = reverse("entry_catalog", args=[self.kanji.pk])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("public", resp["Cache-Control"])
+        self.assertIn("max-age=300", resp["Cache-Control"])
+        self.assertEqual(resp.data["literal"], "泳")
+        self.assertIsNone(resp.data["srs_stage"])
+
+        etag = resp["ETag"]
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(reverse("entry_catalog", args=[9999]))
+        self.assertEqual(resp.status_code, 404)
+        self.assertIn("no-store", resp["Cache-Control"])
+
+        self.client.logout()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertIn(resp.status_code, (401, 403))
+        self.assertNotIn("public", resp["Cache-Control"])
+
+
+class CatalogSnapshotTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⽕", meaning="fire", entry_type=EntryType.RADICAL, level=1
+        )
+        self.kanji = DictionaryEntry.objects.create(
+            literal="炎", meaning="flame", entry_type=EntryType.KANJI, level=4,
+            onyomi_readings=["エン"],
+        )
+        self.kanji.constituents.add(self.radical)
+
+    def test_gzipped_snapshot_with_relation_ids(self):
+        resp = self.client.get(reverse("catalog_snapshot"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        data = json.loads(gzip.decompress(resp.content))
+
+        self.assertEqual(data["version"], get_catalog().content_hash)
+        self.assertEqual(resp["ETag"], f'"{data["version"]}"')
+        entries = {e["id"]: e for e in data["entries"]}
+        self.assertEqual(entries[self.kanji.id]["constituents"], [self.radical.id])
+        self.assertEqual(entries[self.kanji.id]["onyomi_readings"], ["エン"])
+
+    def test_plain_snapshot_and_not_modified(self):
+        resp = self.client.get(reverse("catalog_snapshot"))
+        self.assertNotIn("Content-Encoding", resp)
+        self.assertEqual(len(json.loads(resp.content)["entries"]), 2)
+
+        etag = resp["ETag"]
+        resp = self.client.get(reverse("catalog_snapshot"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertIn("max-age=300", resp["Cache-Control"])
+
+        # Anonymous clients are refused before the ETag is checked, and nothing caches the refusal
+        self.client.logout()
+        resp = self.client.get(reverse("catalog_snapshot"), HTTP_IF_NONE_MATCH=etag)
+        self.assertIn(resp.status_code, (401, 403))
+        self.assertIn("no-store", resp["Cache-Control"])
+        self.assertNotIn("public", resp["Cache-Control"])
+
+    def test_versioned_snapshot_is_immutable(self):
+        version = get_catalog().content_hash
+        url = reverse("catalog_snapshot_version", args=[version])
+
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("immutable", resp["Cache-Control"])
+
+        # Regenerated after a catalog change; the old version is gone
+        self.kanji.meaning = "blaze"
+        self.kanji.save()
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 404)
+        self.assertNotIn("immutable", resp["Cache-Control"])
+        self.assertIn("no-store", resp["Cache-Control"])
+
+        new_version = get_catalog().content_hash
+        self.assertNotEqual(new_version, version)
+        resp = self.client.get(reverse("catalog_snapshot_version", args=[new_version]))
+        entries = {e["id"]: e for e in json.loads(resp.content)["entries"]}
+        self.assertEqual(entries[self.kanji.id]["meaning"], "blaze")
+
+
+class FastRendererTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⽊", meaning="tree", entry_type=EntryType.RADICAL, level=1
+        )
+        self.kanji = DictionaryEntry.objects.create(
+            literal="林", meaning="grove", entry_type=EntryType.KANJI, level=2,
+            kunyomi_readings=["はやし"],
+        )
+        self.kanji.constituents.add(self.radical)
+        self.next_review_at = timezone.now() - timedelta(hours=1)
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.kanji, srs_stage=SRSStage.APPRENTICE_3,
+            next_review_at=self.next_review_at,
+        )
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.radical, srs_stage=SRSStage.GURU_2,
+        )
+
+    def test_fast_json_matches_plain_renderer(self):
+        resp = self.client.get(reverse("get_reviews"))
+
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertEqual(json.loads(resp.content), json.loads(JSONRenderer().render(resp.data)))
+        entry = resp.json()[0]["entry"]
+        self.assertEqual(entry["constituents"][0]["srs_stage"], SRSStage.GURU_2)
+        self.assertTrue(entry["next_review_at"].endswith("Z"))
+
+    def test_msgpack_by_content_negotiation(self):
+        resp = self.client.get(reverse("get_reviews"), HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(resp["Content-Type"], "application/msgpack")
+        data = msgpack.unpackb(resp.content, timestamp=3)
+        entry = data[0]["entry"]
+        self.assertEqual(entry["literal"], "林")
+        self.assertEqual(entry["kunyomi_readings"], ["はやし"])
+        self.assertEqual(entry["next_review_at"], self.next_review_at)
+        self.assertEqual(entry["constituents"][0]["srs_stage"], SRSStage.GURU_2)
+
+    def test_forecast_msgpack_via_format_param(self):
+        resp = self.client.get(reverse("get_review_forecast"), {"tz": "UTC", "format": "msgpack"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(msgpack.unpackb(resp.content), resp.data)
+
+    def test_search_etag_varies_with_accept(self):
+        url = reverse("search")
+        json_resp = self.client.get(url, {"q": "grove"})
+        msgpack_resp = self.client.get(url, {"q": "grove"}, HTTP_ACCEPT="application/msgpack")
+
+        self.assertIn("Accept", json_resp["Vary"])
+        self.assertNotEqual(json_resp["ETag"], msgpack_resp["ETag"])
+        self.assertEqual(msgpack.unpackb(msgpack_resp.content)["results"][0]["entry"]["meaning"], "grove")
+
+
+class TrigramSearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.kanji = DictionaryEntry.objects.create(
+            entry_type=EntryType.KANJI, literal="森", meaning="forest", level=3,
+            kunyomi_readings=["もり"], onyomi_readings=["シン"],
+        )
+        self.vocab = DictionaryEntry.objects.create(
+            entry_type=EntryType.VOCAB, literal="森林", meaning="woods, forest", level=8,
+            reading="しんりん",
+        )
+
+    def test_search_readings_kept_in_sync(self):
+        self.assertEqual(self.kanji.search_readings, "もり シン".casefold())
+
+        self.kanji.onyomi_readings = ["ｼﾝ"]  # half-width katakana
+        self.kanji.save()
+        self.kanji.refresh_from_db()
+        self.assertEqual(self.kanji.search_readings, "もり シン")
+
+    def test_ranked_by_similarity_then_level(self):
+        results = trigram_search(get_catalog(), "forest")
+        self.assertEqual([entry.id for entry in results], [self.kanji.id, self.vocab.id])
+
+        results = trigram_search(get_catalog(), "しんりん")
+        self.assertEqual([entry.id for entry in results], [self.vocab.id])
+
+    def test_page_bounds_run_in_sql(self):
+        results = trigram_search(get_catalog(), "forest")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(results.count(), 2)
+            self.assertEqual([entry.id for entry in results[1:2]], [self.vocab.id])
+        self.assertIn("LIMIT 1 OFFSET 1", queries[1]["sql"])
+
+    @override_settings(SEARCH_BACKEND="trigram")
+    def test_search_view_uses_trigram_backend(self):
+        resp = self.client.get(reverse("search"), {"q": "もり"})
+        self.assertEqual([r["entry"]["literal"] for r in resp.data["results"]], ["森"])
+
+
+@override_settings(SEARCH_BACKEND="index")
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.kanji = DictionaryEntry.objects.create(
+            entry_type=EntryType.KANJI, literal="学", meaning="study, learning", level=2,
+            kunyomi_readings=["まなぶ"], onyomi_readings=["ガク"],
+        )
+        self.vocab = DictionaryEntry.objects.create(
+            entry_type=EntryType.VOCAB, literal="学校", meaning="school", level=4,
+            reading="がっこう",
+        )
+
+    def search_literals(self, query, **params):
+        resp = self.client.get(reverse("search"), {"q": query, **params})
+        self.assertEqual(resp.status_code, 200)
+        return [r["entry"]["literal"] for r in resp.data["results"]]
+
+    def test_romaji_conversion(self):
+        self.assertEqual(romaji_to_hiragana("gakkou"), "がっこう")
+        self.assertEqual(romaji_to_hiragana("konnichiha"), "こんにちは")
+        self.assertEqual(romaji_to_hiragana("kan'i"), "かんい")
+        self.assertIsNone(romaji_to_hiragana("school"))
+        self.assertEqual(normalize_kana("ｶﾞｯｺｳ"), "がっこう")
+
+    def test_kana_variants_hit_same_postings(self):
+        for query in ("がく", "ガク", "ｶﾞｸ", "gaku"):
+            with self.subTest(query=query):
+                self.assertEqual(self.search_literals(query), ["学"])
+
+        self.assertEqual(self.search_literals("gakkou"), ["学校"])
+        self.assertEqual(self.search_literals("学"), ["学", "学校"])
+
+    def test_meaning_word_prefixes(self):
+        self.assertEqual(self.search_literals("lear"), ["学"])
+        self.assertEqual(self.search_literals("ＳＣＨＯＯＬ"), ["学校"])
+        self.assertEqual(self.search_literals("hool"), [])
+
+    def test_only_whole_romaji_queries_looked_up_as_kana(self):
+        self.assertEqual(self.search_literals("manabu"), ["学"])
+        # "mad" isn't romaji; its "ma" mustn't match まなぶ
+        self.assertEqual(self.search_literals("mad"), [])
+
+    def test_only_user_state_queries(self):
+        get_catalog().search_index
+
+        # Session, catalog version and user state only; the search itself runs in memory
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search_literals("学", cursor=""), ["学", "学校"])
+        self.assertFalse(any("kanjilearner_dictionaryentry" in q["sql"] for q in queries))
+
+
+class TypeaheadTest(TestCase):
+    def setUp(self):
+        self.rain = DictionaryEntry.objects.create(
+            entry_type=EntryType.KANJI, literal="雨", meaning="rain", level=3,
+            kunyomi_readings=["あめ"], onyomi_readings=["ウ"],
+        )
+        self.rainbow = DictionaryEntry.objects.create(
+            entry_type=EntryType.VOCAB, literal="虹", meaning="rainbow", level=9, reading="にじ",
+        )
+        self.eat = DictionaryEntry.objects.create(
+            entry_type=EntryType.VOCAB, literal="食べる", meaning="to eat", level=5, reading="たべる",
+        )
+
+    def complete(self, query, **params):
+        resp = self.client.get(reverse("typeahead"), {"q": query, **params})
+        self.assertEqual(resp.status_code, 200)
+        return [r["literal"] for r in resp.data["results"]]
+
+    def test_prefixes_of_meanings_readings_and_literals(self):
+        self.assertEqual(self.complete("rai"), ["雨", "虹"])
+        self.assertEqual(self.complete("rain", limit=1), ["雨"])
+        self.assertEqual(self.complete("eat"), ["食べる"])
+        self.assertEqual(self.complete("to e"), ["食べる"])
+        self.assertEqual(self.complete("タベ"), ["食べる"])
+        self.assertEqual(self.complete("tab"), ["食べる"])
+        self.assertEqual(self.complete("食"), ["食べる"])
+        self.assertEqual(self.complete("ain"), [])
+
+    def test_unfinished_romaji_only_without_other_matches(self):
+        DictionaryEntry.objects.create(entry_type=EntryType.KANJI, literal="犬", meaning="dog", level=1, kunyomi_readings=["いぬ"])
+        DictionaryEntry.objects.create(entry_type=EntryType.KANJI, literal="度", meaning="degree", level=1, onyomi_readings=["ド"])
+        self.assertEqual(self.complete("dog"), ["犬"])
+        self.assertEqual(self.complete("dor"), ["度"])
+
+    def test_no_database_access(self):
+        get_catalog().typeahead
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("typeahead"), {"q": "ame"})
+        self.assertEqual(resp.data["results"], [{"id": self.rain.id, "literal": "雨"}])
+        self.assertIn("public", resp["Cache-Control"])
+
+
+class KanjiByRadicalsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.tree = DictionaryEntry.objects.create(literal="⽊", meaning="tree", entry_type=EntryType.RADICAL, level=1)
+        self.sun = DictionaryEntry.objects.create(literal="⽇", meaning="sun", entry_type=EntryType.RADICAL, level=1)
+        self.grove = DictionaryEntry.objects.create(literal="林", meaning="grove", entry_type=EntryType.KANJI, level=2)
+        self.east = DictionaryEntry.objects.create(literal="東", meaning="east", entry_type=EntryType.KANJI, level=3)
+        self.bright = DictionaryEntry.objects.create(literal="明", meaning="bright", entry_type=EntryType.KANJI, level=4)
+        self.grove.constituents.add(self.tree)
+        self.east.constituents.add(self.tree, self.sun)
+        self.bright.constituents.add(self.sun)
+
+    def lookup(self, radicals):
+        return self.client.get(reverse("kanji_by_radicals"), {"radicals": radicals})
+
+    def test_intersects_radicals(self):
+        resp = self.lookup(f"{self.tree.id}")
+        self.assertEqual([k["literal"] for k in resp.data["results"]], ["林", "東"])
+        self.assertEqual(resp.data["available_radicals"], sorted([self.tree.id, self.sun.id]))
+
+        resp = self.lookup(f"{self.tree.id},{self.sun.id}")
+        self.assertEqual([k["literal"] for k in resp.data["results"]], ["東"])
+
+    def test_no_relation_queries(self):
+        get_catalog()
+
+        # session + user + catalog version
+        with self.assertNumQueries(3):
+            resp = self.lookup(f"{self.sun.id}")
+        self.assertEqual([k["literal"] for k in resp.data["results"]], ["東", "明"])
+
+    def test_rejects_non_radicals(self):
+        self.assertEqual(self.lookup("").status_code, 400)
+        self.assertEqual(self.lookup("abc").status_code, 400)
+        self.assertEqual(self.lookup(f"{self.grove.id}").status_code, 400)
+
+
+class BatchReviewSubmissionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+
+        self.radical = DictionaryEntry.objects.create(
+            literal="⼈", meaning="person", entry_type=EntryType.RADICAL, level=1
+        )
+        self.planned_kanji = DictionaryEntry.objects.create(
+            literal="休", meaning="rest", entry_type=EntryType.KANJI, level=2
+        )
+        self.planned_kanji.constituents.add(self.radical)
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.radical, srs_stage=SRSStage.APPRENTICE_4,
+            next_review_at=timezone.now() - timedelta(hours=1),
+        )
+        UserDictionaryEntry.objects.create(user=self.user, entry=self.planned_kanji)
+        PlannedEntry.objects.create(user=self.user, entry=self.planned_kanji)
+
+    def make_reviews(self, n):
+        entries = []
+        for i in range(n):
+            entry = DictionaryEntry.objects.create(
+                literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=3
+            )
+            UserDictionaryEntry.objects.create(
+                user=self.user, entry=entry, srs_stage=SRSStage.APPRENTICE_2,
+                next_review_at=timezone.now() - timedelta(hours=1),
+            )
+            entries.append(entry)
+        return entries
+
+    def submit(self, results):
+        return self.client.post(
+            reverse("result_batch"), {"results": results}, content_type="application/json"
+        )
+
+    def test_applies_transitions_mistakes_and_plan(self):
+        right, wrong, fixed = self.make_reviews(3)
+        RecentMistake.objects.create(user=self.user, entry=right)
+        answered_at = (timezone.now() - timedelta(minutes=5)).isoformat()
+
+        resp = self.submit([
+            {"entry_id": self.radical.id, "correct": True},
+            {"entry_id": right.id, "correct": True, "answered_at": answered_at},
+            {"entry_id": wrong.id, "correct": False},
+            {"entry_id": fixed.id, "correct": False, "answered_at": answered_at},
+            {"entry_id": fixed.id, "correct": True},
+        ])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["errors"], [])
+
+        stages = dict(UserDictionaryEntry.objects.filter(user=self.user).values_list("entry_id", "srs_stage"))
+        self.assertEqual(stages[self.radical.id], SRSStage.GURU_1)
+        self.assertEqual(stages[right.id], SRSStage.APPRENTICE_3)
+        self.assertEqual(stages[wrong.id], SRSStage.APPRENTICE_1)
+        self.assertEqual(stages[fixed.id], SRSStage.APPRENTICE_2)  # A2 → A1 → A2
+
+        mistakes = set(RecentMistake.objects.filter(user=self.user).values_list("entry_id", flat=True))
+        self.assertEqual(mistakes, {wrong.id})
+
+        # The radical reached Guru, so the planned kanji was unlocked
+        self.assertEqual(stages[self.planned_kanji.id], SRSStage.LESSON)
+        self.assertFalse(PlannedEntry.objects.filter(user=self.user).exists())
+
+    def test_correct_answer_finishes_lesson(self):
+        lessons = []
+        for literal in ("L1", "L2"):
+            entry = DictionaryEntry.objects.create(literal=literal, meaning="lesson", entry_type=EntryType.KANJI, level=3)
+            UserDictionaryEntry.objects.create(user=self.user, entry=entry, srs_stage=SRSStage.LESSON)
+            lessons.append(entry)
+
+        resp = self.submit([{"entry_id": lessons[0].id, "correct": True}])
+        self.assertEqual(resp.data["results"][0]["new_stage"], SRSStage.APPRENTICE_1)
+        single = self.client.post(reverse("result_success"), {"entry_id": lessons[1].id}, format="json")
+        self.assertEqual(single.data["new_stage"], SRSStage.APPRENTICE_1)
+
+        # Locked items still only move through unlock()
+        UserDictionaryEntry.objects.filter(user=self.user, entry=lessons[0]).update(srs_stage=SRSStage.LOCKED)
+        resp = self.submit([{"entry_id": lessons[0].id, "correct": True}])
+        self.assertEqual(resp.data["results"][0]["new_stage"], SRSStage.LOCKED)
+
+    def test_query_count_independent_of_batch_size(self):
+        def count_queries(entries):
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.submit([
+                    {"entry_id": entry.id, "correct": i % 3 != 0} for i, entry in enumerate(entries)
+                ])
+            self.assertEqual(len(resp.data["results"]), len(entries))
+            return len(queries)
+
+        entries = self.make_reviews(40)
+        get_catalog()  # warm this worker's catalog
+        self.assertEqual(count_queries(entries[:10]), count_queries(entries[10:]))
+
+    def test_invalid_and_unknown_entries(self):
+        self.assertEqual(self.submit([]).status_code, 400)
+        self.assertEqual(self.submit([{"entry_id": "x", "correct": True}]).status_code, 400)
+
+        resp = self.submit([{"entry_id": 99999, "correct": True}])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["errors"][0]["entry_id"], 99999)
+
+
+class AtomicSRSTransitionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        self.entry = DictionaryEntry.objects.create(
+            literal="水", meaning="Water", entry_type=EntryType.KANJI, level=1
+        )
+        self.unlocked_at = timezone.now() - timedelta(days=3)
+        self.ude = UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.entry, srs_stage=SRSStage.APPRENTICE_1,
+            unlocked_at=self.unlocked_at,
+        )
+
+    def post(self, name):
+        return self.client.post(reverse(name), {"entry_id": self.entry.id}, format="json")
+
+    def test_single_update_touching_only_review_columns(self):
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.post("result_success")
+        self.assertEqual(resp.status_code, 200)
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE") and "userdictionaryentry" in q["sql"]]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("RETURNING", updates[0])
+        self.assertNotIn("unlocked_at", updates[0])
+
+        self.ude.refresh_from_db()
+        self.assertEqual(self.ude.srs_stage, SRSStage.APPRENTICE_2)
+        self.assertEqual(self.ude.unlocked_at, self.unlocked_at)
+        self.assertIsNotNone(self.ude.last_reviewed_at)
+        # Same rounding as UserDictionaryEntry.promote()
+        self.assertEqual(resp.data["new_stage"], SRSStage.APPRENTICE_2)
+        self.assertEqual(resp.data["next_review_at"], self.ude.next_review_at)
+        self.assertEqual(self.ude.next_review_at.minute, 0)
+        self.assertEqual(self.ude.next_review_at.second, 0)
+
+    def test_answers_from_stale_copies_are_not_lost(self):
+        # Two tabs holding the same A1 item both answer correctly
+        self.post("result_success")
+        self.post("result_success")
+        self.ude.refresh_from_db()
+        self.assertEqual(self.ude.srs_stage, SRSStage.APPRENTICE_3)
+
+    def test_failure_demotes_and_records_mistake(self):
+        UserDictionaryEntry.objects.filter(pk=self.ude.pk).update(srs_stage=SRSStage.GURU_2)
+        resp = self.post("result_failure")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["new_stage"], SRSStage.APPRENTICE_4)
+        self.assertTrue(RecentMistake.objects.filter(user=self.user, entry=self.entry).exists())
+
+    def test_stage_without_transition_is_reported_unchanged(self):
+        UserDictionaryEntry.objects.filter(pk=self.ude.pk).update(srs_stage=SRSStage.BURNED, next_review_at=None)
+        resp = self.post("result_success")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["new_stage"], SRSStage.BURNED)
+        self.assertIsNone(resp.data["next_review_at"])
+
+    def test_missing_user_entry_is_404(self):
+        self.ude.delete()
+        self.assertEqual(self.post("result_success").status_code, 404)
+        self.assertEqual(self.client.post(reverse("result_failure"), {"entry_id": 99999}, format="json").status_code, 404)
+
+
+class ReviewEventLogTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        self.water, self.fire = [
+            DictionaryEntry.objects.create(literal=literal, meaning=meaning, entry_type=EntryType.KANJI, level=1)
+            for literal, meaning in [("水", "Water"), ("火", "Fire")]
+        ]
+        for entry in (self.water, self.fire):
+            UserDictionaryEntry.objects.create(user=self.user, entry=entry, srs_stage=SRSStage.APPRENTICE_3)
+
+    def test_single_review_endpoints_append_events(self):
+        self.client.post(reverse("result_success"), {"entry_id": self.water.id, "latency_ms": 1500}, format="json")
+        self.client.post(reverse("result_failure"), {"entry_id": self.water.id}, format="json")
+
+        events = list(ReviewEvent.objects.filter(user=self.user).order_by("id"))
+        self.assertEqual(
+            [(e.correct, e.stage_before, e.stage_after, e.latency_ms) for e in events],
+            [
+                (True, SRSStage.APPRENTICE_3, SRSStage.APPRENTICE_4, 1500),
+                (False, SRSStage.APPRENTICE_4, SRSStage.APPRENTICE_1, None),
+            ],
+        )
+
+        for latency_ms in (-5, 2**31, "²"):
+            resp = self.client.post(
+                reverse("result_success"), {"entry_id": self.water.id, "latency_ms": latency_ms}, format="json"
+            )
+            self.assertEqual(resp.status_code, 400)
+            resp = self.client.post(reverse("result_batch"), {"results": [
+                {"entry_id": self.water.id, "correct": True, "latency_ms": latency_ms},
+            ]}, content_type="application/json")
+            self.assertEqual(resp.status_code, 400)
+        self.assertEqual(ReviewEvent.objects.count(), 2)
+
+    def test_batch_writes_events_in_one_insert(self):
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(reverse("result_batch"), {"results": [
+                {"entry_id": self.water.id, "correct": True, "latency_ms": 800},
+                {"entry_id": self.fire.id, "correct": False},
+            ]}, content_type="application/json")
+        self.assertEqual(resp.status_code, 200)
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "kanjilearner_reviewevent"')]
+        self.assertEqual(len(inserts), 1)
+
+        events = {e.entry_id: e for e in ReviewEvent.objects.filter(user=self.user)}
+        self.assertEqual(events[self.water.id].stage_after, SRSStage.APPRENTICE_4)
+        self.assertEqual(events[self.water.id].latency_ms, 800)
+        self.assertEqual(events[self.fire.id].stage_after, SRSStage.APPRENTICE_1)
+
+    def test_archive_moves_old_events_to_file(self):
+        now = timezone.now()
+        for days in (40, 35, 1):
+            ReviewEvent.objects.create(
+                user=self.user, entry=self.water, timestamp=now - timedelta(days=days), correct=True,
+                stage_before=SRSStage.APPRENTICE_1, stage_after=SRSStage.APPRENTICE_2,
+            )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.jsonl.gz")
+            before = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+            call_command("archive_review_events", before=before, output=path, batch_size=1, stdout=io.StringIO())
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                archived = [json.loads(line) for line in f]
+
+        self.assertEqual(len(archived), 2)
+        self.assertEqual(archived[0]["entry_id"], self.water.id)
+        self.assertEqual(ReviewEvent.objects.count(), 1)
+
+
+class QueueIndexTest(TestCase):
+    """The review / lesson queue queries use the partial indexes on a large table."""
+
+    USERS = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        entry_ids = [
+            DictionaryEntry.objects.create(
+                literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=1 + i // 10
+            ).id
+            for i in range(40)
+        ]
+        # Mostly locked, like a real account: 24 of 40 LOCKED, 2 LESSON, the rest spread over the SRS
+        stages = [SRSStage.LOCKED] * 24 + [SRSStage.LESSON] * 2 + [
+            stage for stage in SRSStage if stage not in (SRSStage.LOCKED, SRSStage.LESSON)
+        ] * 2 + [SRSStage.BURNED] * 4
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO auth_user (username, password, is_superuser, is_staff, is_active,
+                                       first_name, last_name, email, date_joined)
+                SELECT 'seed' || i, '!', false, false, true, '', '', '', now()
+                FROM generate_series(1, %s) AS i
+                """,
+                [cls.USERS],
+            )
+            cursor.execute(
+                """
+                INSERT INTO kanjilearner_userdictionaryentry
+                    (user_id, entry_id, srs_stage, next_review_at, user_synonyms, user_sentences)
+                SELECT u.id, e.id, s.stage,
+                       CASE WHEN s.stage IN ('LOCKED', 'LESSON', 'BURNED') THEN NULL
+                            ELSE now() + ((u.id * 7 + e.id) %% 336 - 168) * interval '1 hour' END,
+                       '{}', '{}'
+                FROM auth_user u
+                CROSS JOIN unnest(%s::int[]) WITH ORDINALITY AS e(id, n)
+                JOIN unnest(%s::text[]) WITH ORDINALITY AS s(stage, n) ON s.n = e.n
+                -- Reviews rewrite rows, so one user's UDEs end up spread over the heap
+                ORDER BY random()
+                """,
+                [entry_ids, [stage.value for stage in stages]],
+            )
+            cursor.execute("ANALYZE kanjilearner_userdictionaryentry")
+        cls.user = User.objects.get(username="seed5000")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_due_reviews_use_partial_index(self):
+        now = timezone.now()
+        reviews = (
+            UserDictionaryEntry.objects
+            .filter(user=self.user)
+            .exclude(srs_stage__in=NOT_IN_REVIEWS)
+            .filter(next_review_at__lte=now)
+            .order_by("entry__level")
+        )
+        self.assertUsesIndex(reviews[:100], "ude_user_due_review")
+        self.assertUsesIndex(UserDictionaryEntry.get_pending_reviews(self.user), "ude_user_due_review")
+
+        forecast = (
+            UserDictionaryEntry.objects
+            .filter(user=self.user)
+            .exclude(srs_stage__in=[*NOT_IN_REVIEWS, SRSStage.BURNED])
+            .filter(next_review_at__gt=now, next_review_at__lte=now + timedelta(days=7))
+            .values_list("next_review_at", flat=True)
+        )
+        self.assertUsesIndex(forecast, "ude_user_due_review")
+
+    def test_lessons_use_partial_index(self):
+        lessons = (
+            UserDictionaryEntry.objects
+            .filter(user=self.user, srs_stage=SRSStage.LESSON)
+            .order_by("entry__level")
+        )
+        self.assertUsesIndex(lessons[:100], "ude_user_lesson")
+
+
+class QueueCountsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        self.entries = [
+            DictionaryEntry.objects.create(literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=1)
+            for i in range(4)
+        ]
+        self.udes = [UserDictionaryEntry.objects.create(user=self.user, entry=entry) for entry in self.entries]
+
+    def counts(self):
+        resp = self.client.get(reverse("get_queue_counts"))
+        self.assertEqual(resp.status_code, 200)
+        return resp.data["lessons"], resp.data["reviews"]
+
+    def assertMatchesRebuild(self):
+        counts = UserQueueCounts.objects.get(pk=self.user.id)
+        rebuilt = UserQueueCounts.rebuild(self.user.id)
+        self.assertEqual((counts.lessons, counts.review_buckets), (rebuilt.lessons, rebuilt.review_buckets))
+
+    def test_srs_methods_keep_counts(self):
+        self.assertEqual(self.counts(), (0, 0))
+        for ude in self.udes:
+            ude.unlock()
+        self.assertEqual(self.counts(), (4, 0))
+
+        self.udes[0].complete_lesson()
+        self.assertEqual(self.counts(), (3, 0))
+
+        # Answered long ago, so the new next_review_at is already due
+        long_ago = timezone.now() - timedelta(days=30)
+        self.udes[0].promote(now=long_ago)
+        self.assertEqual(self.counts(), (3, 1))
+        self.udes[0].demote(now=long_ago)
+        self.assertEqual(self.counts(), (3, 1))
+        self.udes[0].promote()
+        self.assertEqual(self.counts(), (3, 0))
+        self.assertMatchesRebuild()
+
+    def test_review_endpoints_keep_counts(self):
+        due = timezone.now() - timedelta(hours=2)
+        UserDictionaryEntry.objects.filter(user=self.user).update(srs_stage=SRSStage.APPRENTICE_2, next_review_at=due)
+        self.assertEqual(self.counts(), (0, 4))
+
+        self.client.post(reverse("result_success"), {"entry_id": self.entries[0].id}, format="json")
+        self.client.post(reverse("result_failure"), {"entry_id": self.entries[1].id}, format="json")
+        self.assertEqual(self.counts(), (0, 2))
+
+        self.client.post(reverse("result_batch"), {"results": [
+            {"entry_id": self.entries[2].id, "correct": True},
+            {"entry_id": self.entries[3].id, "correct": False},
+        ]}, content_type="application/json")
+        self.assertEqual(self.counts(), (0, 0))
+        self.assertMatchesRebuild()
+
+        summary = UserQueueCounts.objects.get(pk=self.user.id).summary()
+        self.assertGreater(summary["next_review_at"], timezone.now())
+
+    def test_due_within_the_hour_matches_get_reviews(self):
+        now = timezone.now().replace(microsecond=0)
+        later = now + timedelta(minutes=5)
+        UserDictionaryEntry.objects.filter(pk=self.udes[0].pk).update(
+            srs_stage=SRSStage.APPRENTICE_2, next_review_at=now - timedelta(minutes=5),
+        )
+        UserDictionaryEntry.objects.filter(pk=self.udes[1].pk).update(
+            srs_stage=SRSStage.APPRENTICE_2, next_review_at=later,
+        )
+        summary = UserQueueCounts.rebuild(self.user.id).summary(now)
+        self.assertEqual(summary["reviews"], UserDictionaryEntry.get_pending_reviews(self.user).count())
+        self.assertEqual(summary["next_review_at"], later)
+        self.assertEqual(UserQueueCounts.objects.get(pk=self.user.id).summary(later)["reviews"], 2)
+
+    def test_counts_read_without_user_entries(self):
+        self.counts()
+        with CaptureQueriesContext(connection) as queries:
+            self.counts()
+        self.assertFalse([q for q in queries if "userdictionaryentry" in q["sql"]])
+
+    def test_rebuild_command_fixes_drift(self):
+        self.udes[0].unlock()
+        # Writes that bypass the SRS methods leave the counts behind
+        UserDictionaryEntry.objects.filter(user=self.user).update(srs_stage=SRSStage.LESSON)
+        self.assertEqual(self.counts(), (1, 0))
+
+        out = io.StringIO()
+        call_command("rebuild_queue_counts", user_id=[self.user.id], stdout=out)
+        self.assertIn("1 had drifted", out.getvalue())
+        self.assertEqual(self.counts(), (4, 0))
+
+
+class ReviewSessionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        now = timezone.now()
+        self.entries = []
+        for i in range(6):
+            entry = DictionaryEntry.objects.create(
+                literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=6 - i
+            )
+            UserDictionaryEntry.objects.create(
+                user=self.user, entry=entry, srs_stage=SRSStage.APPRENTICE_2,
+                next_review_at=now - timedelta(hours=i + 1),
+            )
+            self.entries.append(entry)
+
+    def start(self, **payload):
+        resp = self.client.post(reverse("start_review_session"), payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        return resp.data["session_id"], resp.data["total"]
+
+    def items(self, session_id, limit, **params):
+        url = reverse("review_session_items", args=[session_id])
+        return self.client.get(url, {"limit": limit, **params})
+
+    def test_queue_snapshotted_once_and_handed_out_in_chunks(self):
+        session_id, total = self.start(size=4)
+        self.assertEqual(total, 4)
+
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.items(session_id, 3, view="card")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("next_review_at", " ".join(q["sql"] for q in queries))
+        # Lowest level first, as get_reviews sorts
+        self.assertEqual([item["entry"]["level"] for item in resp.data["items"]], [1, 2, 3])
+
+        # Newly due reviews don't join a running session
+        extra = DictionaryEntry.objects.create(literal="X", meaning="x", entry_type=EntryType.KANJI, level=0)
+        UserDictionaryEntry.objects.create(
+            user=self.user, entry=extra, srs_stage=SRSStage.APPRENTICE_1, next_review_at=timezone.now(),
+        )
+        self.assertEqual(self.items(session_id, 10).data["total"], 4)
+
+    def test_due_ordering(self):
+        session_id, _ = self.start(order="due")
+        resp = self.items(session_id, 2, view="card")
+        self.assertEqual([item["entry"]["id"] for item in resp.data["items"]], [self.entries[5].id, self.entries[4].id])
+
+    def test_results_apply_and_leave_later_chunks(self):
+        session_id, _ = self.start(size=2)
+        first, second = [item["entry"]["id"] for item in self.items(session_id, 2, view="card").data["items"]]
+
+        resp = self.client.post(reverse("review_session_results", args=[session_id]), {"results": [
+            {"entry_id": first, "correct": True},
+            {"entry_id": self.entries[0].id, "correct": True},  # not in this session
+        ]}, content_type="application/json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([outcome["entry_id"] for outcome in resp.data["results"]], [first])
+        self.assertEqual(resp.data["errors"][0]["entry_id"], self.entries[0].id)
+        self.assertEqual(resp.data["remaining"], 1)
+        self.assertEqual(
+            UserDictionaryEntry.objects.get(user=self.user, entry_id=first).srs_stage, SRSStage.APPRENTICE_3
+        )
+
+        chunk = self.items(session_id, 2, view="card").data["items"]
+        self.assertEqual([item["entry"]["id"] for item in chunk], [second])
+
+    def test_retried_answers_not_applied_twice(self):
+        session_id, _ = self.start(size=2)
+        first = self.items(session_id, 1, view="card").data["items"][0]["entry"]["id"]
+        url = reverse("review_session_results", args=[session_id])
+        payload = {"results": [{"entry_id": first, "correct": True}]}
+
+        self.client.post(url, payload, content_type="application/json")
+        resp = self.client.post(url, payload, content_type="application/json")
+        self.assertEqual(resp.data["results"], [])
+        self.assertEqual(resp.data["errors"][0]["entry_id"], first)
+        self.assertEqual(
+            UserDictionaryEntry.objects.get(user=self.user, entry_id=first).srs_stage, SRSStage.APPRENTICE_3
+        )
+
+        with review_sessions.session_lock(session_id):
+            resp = self.client.post(url, payload, content_type="application/json")
+        self.assertEqual(resp.status_code, 409)
+
+    def test_sessions_are_per_user(self):
+        session_id, _ = self.start()
+        other = User.objects.create_user(username="other", password="pw")
+        self.client.force_login(other)
+        self.assertEqual(self.items(session_id, 10).status_code, 404)
+        self.assertEqual(self.items("nope", 10).status_code, 404)
+        self.assertEqual(self.client.post(reverse("start_review_session"), {"order": "x"}, format="json").status_code, 400)
+
+
+class DashboardSummaryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        now = timezone.now()
+        stages = [
+            (SRSStage.LESSON, None),
+            (SRSStage.APPRENTICE_1, now - timedelta(hours=1)),
+            (SRSStage.GURU_1, now + timedelta(hours=3)),
+            (SRSStage.BURNED, None),
+            (SRSStage.LOCKED, None),
+        ]
+        for i, (srs_stage, next_review_at) in enumerate(stages):
+            entry = DictionaryEntry.objects.create(
+                literal=f"K{i}", meaning=f"kanji {i}", entry_type=EntryType.KANJI, level=1
+            )
+            UserDictionaryEntry.objects.create(
+                user=self.user, entry=entry, srs_stage=srs_stage, next_review_at=next_review_at,
+            )
+            if srs_stage == SRSStage.APPRENTICE_1:
+                RecentMistake.objects.create(user=self.user, entry=entry)
+        UserQueueCounts.rebuild(self.user.id)
+
+    def get(self, **params):
+        return self.client.get(reverse("get_dashboard"), params)
+
+    def test_matches_individual_endpoints(self):
+        resp = self.get(tz="Asia/Tokyo")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["lessons"], 1)
+        self.assertEqual(resp.data["reviews"], 1)
+        self.assertEqual(resp.data["recent_mistakes"], 1)
+
+        counts = self.client.get(reverse("get_queue_counts"))
+        self.assertEqual((resp.data["lessons"], resp.data["reviews"]), (counts.data["lessons"], counts.data["reviews"]))
+        forecast = self.client.get(reverse("get_review_forecast"), {"tz": "Asia/Tokyo"})
+        self.assertEqual(resp.data["forecast"], forecast.data)
+        spread = self.client.get(reverse("item_spread"))
+        self.assertEqual(resp.data["item_spread"], spread.data)
+        self.assertEqual(resp.data["item_spread"]["guru"]["kanji"], 1)
+        self.assertEqual(resp.data["item_spread"]["burned"]["kanji"], 1)
+
+    def test_aggregate_queries_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(tz="UTC")
+        # Forecast and item spread; the queue counts are a UserQueueCounts lookup
+        ude_queries = [q["sql"] for q in queries if "kanjilearner_userdictionaryentry" in q["sql"]]
+        self.assertEqual(len(ude_queries), 2)
+        self.assertFalse([sql for sql in ude_queries if "user_synonyms" in sql])
+
+    def test_requires_timezone(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(tz="Nowhere/Special").status_code, 400)
+
+
+class ItemSpreadCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        entry = DictionaryEntry.objects.create(literal="人", meaning="person", entry_type=EntryType.KANJI, level=1)
+        self.ude = UserDictionaryEntry.objects.create(
+            user=self.user, entry=entry, srs_stage=SRSStage.APPRENTICE_4,
+            next_review_at=timezone.now() - timedelta(hours=1),
+        )
+
+    def spread(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse("item_spread")).data
+        ude_queries = [q for q in queries if "kanjilearner_userdictionaryentry" in q["sql"]]
+        return data, len(ude_queries)
+
+    def test_single_group_by_then_cached(self):
+        data, queries = self.spread()
+        self.assertEqual(data["apprentice"]["kanji"], 1)
+        self.assertEqual(queries, 1)
+        self.assertEqual(self.spread(), (data, 0))
+
+    def test_invalidated_by_stage_changes_only(self):
+        self.spread()
+        self.ude.user_synonyms = ["human"]
+        self.ude.save()
+        self.assertEqual(self.spread()[1], 0)
+
+        self.client.post(reverse("result_success"), {"entry_id": self.ude.entry_id}, format="json")
+        data, queries = self.spread()
+        self.assertEqual(queries, 1)
+        self.assertEqual(data["apprentice"]["kanji"], 0)
+        self.assertEqual(data["guru"]["kanji"], 1)
+
+
+class ReviewSchedulerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pw")
+        self.client.force_login(self.user)
+        self.entry = DictionaryEntry.objects.create(literal="水", meaning="Water", entry_type=EntryType.KANJI, level=1)
+        self.ude = UserDictionaryEntry.objects.create(
+            user=self.user, entry=self.entry, srs_stage=SRSStage.APPRENTICE_1,
+            next_review_at=timezone.now() - timedelta(hours=1),
+        )
+        self.now = timezone.now().replace(hour=8, minute=17)
+
+    def test_strategies_stay_within_the_hour(self):
+        hour = ceil_to_next_hour(self.now + SRS_INTERVALS[SRSStage.GURU_1])
+        for name in ("hourly", "offset", "jitter"):
+            with override_settings(REVIEW_SCHEDULER=name):
+                review_at = schedule_review(self.user.id, SRSStage.GURU_1, self.now)
+            self.assertGreaterEqual(review_at, hour)
+            self.assertLess(review_at, hour + SPREAD)
+        self.assertIsNone(schedule_review(self.user.id, SRSStage.BURNED, self.now))
+
+    @override_settings(REVIEW_SCHEDULER="offset")
+    def test_offset_used_by_model_and_single_update(self):
+        self.ude.promote(now=self.now)
+        hour = ceil_to_next_hour(self.now + SRS_INTERVALS[SRSStage.APPRENTICE_2])
+        self.assertEqual(self.ude.next_review_at, hour + user_offset(self.user.id))
+
+        resp = self.client.post(reverse("result_success"), {"entry_id": self.entry.id}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        review_at = resp.data["next_review_at"]
+        self.assertEqual(review_at - review_at.replace(minute=0, second=0, microsecond=0), user_offset(self.user.id))
+
+    @override_settings(REVIEW_SCHEDULER="offset")
+    def test_finished_lessons_scheduled_like_answers(self):
+        # complete_lesson goes through the scheduler, as a correct answer on a
+        # lesson (LESSON → A1) does, rather than now + 4h to the microsecond
+        lesson = DictionaryEntry.objects.create(literal="火", meaning="Fire", entry_type=EntryType.KANJI, level=1)
+        ude = UserDictionaryEntry.objects.create(user=self.user, entry=lesson, srs_stage=SRSStage.LESSON)
+        orig_now = timezone.now
+        timezone.now = lambda: self.now
+        try:
+            ude.complete_lesson()
+        finally:
+            timezone.now = orig_now
+
+        hour = ceil_to_next_hour(self.now + SRS_INTERVALS[SRSStage.APPRENTICE_1])
+        self.assertEqual(ude.next_review_at, hour + user_offset(self.user.id))
+        self.assertEqual(ude.next_review_at, schedule_review(self.user.id, SRSStage.APPRENTICE_1, self.now))
+
+    def test_jitter_reproducible_with_rng(self):
+        def schedule(seed):
+            rng = random.Random(seed)
+            return [schedule_review(self.user.id, SRSStage.GURU_1, self.now, jitter, rng) for _ in range(5)]
+        self.assertEqual(schedule(1), schedule(1))
+
+    def test_offsets_spread_consecutive_users(self):
+        offsets = {user_offset(user_id) for user_id in range(1, 61)}
+        self.assertEqual(len(offsets), 60)
+
+    def test_simulation_reports_each_strategy(self):
+        out = io.StringIO()
+        call_command("simulate_review_load", users=50, items=5, days=2, stdout=out)
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[1:]}
+        self.assertEqual(set(rows), {"hourly", "offset", "jitter"})
+        # peak/avg: spreading reviews over the hour flattens the :00 spike
+        self.assertLess(float(rows["offset"][4]), float(rows["hourly"][4]))
+
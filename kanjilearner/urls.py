@@ -7,12 +7,23 @@ urlpatterns = [
     path("api/login/", views.login_view),
     path("api/lessons/", views.get_lessons, name="get_lessons"),
     path("api/reviews/", views.get_reviews, name="get_reviews"),
+    path("api/queue_counts/", views.get_queue_counts, name="get_queue_counts"),
     path("api/mistakes/", views.get_recent_mistakes, name="get_recent_mistakes"),
+    path("api/dashboard/", views.get_dashboard, name="get_dashboard"),
     path("api/review_forecast/", views.get_review_forecast, name="get_review_forecast"),
     path('api/result/success/', views.result_success, name='result_success'),
     path('api/result/failure/', views.result_failure, name='result_failure'),
+    path('api/result/batch/', views.result_batch, name='result_batch'),
+    path("api/review_sessions/", views.start_review_session, name="start_review_session"),
+    path("api/review_sessions/<str:session_id>/items/", views.review_session_items, name="review_session_items"),
+    path("api/review_sessions/<str:session_id>/results/", views.review_session_results, name="review_session_results"),
     path("api/search", views.search, name="search"),
+    path("api/search/typeahead/", views.typeahead, name="typeahead"),
+    path("api/kanji/by-radicals/", views.kanji_by_radicals, name="kanji_by_radicals"),
     path("api/dictionary/<int:pk>/", views.entry_detail, name="entry_detail"),
+    path("api/dictionary/<int:pk>/catalog/", views.entry_catalog, name="entry_catalog"),
+    path("api/catalog/snapshot/", views.catalog_snapshot, name="catalog_snapshot"),
+    path("api/catalog/snapshot/<str:version>/", views.catalog_snapshot_version, name="catalog_snapshot_version"),
     path("api/planned/", views.get_planned, name="get_planned"),
     path("api/plan_add/", views.plan_add, name="plan_add"),
     path("api/whoami/", views.whoami, name="whoami"),
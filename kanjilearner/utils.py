@@ -1,6 +1,7 @@
 from django.utils import timezone
 from .models import DictionaryEntry, UserDictionaryEntry  # Adjust the import path if needed
 from .constants import EntryType, SRSStage  # Adjust path as needed
+from .services.stage_cache import invalidate_stage_cache
 
 def initialize_user_dictionary_entries(user):
     entries = DictionaryEntry.objects.all()
@@ -18,7 +19,6 @@ def initialize_user_dictionary_entries(user):
                 unlocked_at=now,
                 next_review_at=None,
                 last_reviewed_at=now,
-                review_history=[],
             ))
         else:
             # Everything else → locked
@@ -29,7 +29,7 @@ def initialize_user_dictionary_entries(user):
                 unlocked_at=None,
                 next_review_at=None,
                 last_reviewed_at=None,
-                review_history=[],
             ))
 
     UserDictionaryEntry.objects.bulk_create(bulk_entries, ignore_conflicts=True)
+    invalidate_stage_cache(user.id)  # level 0 entries start out burned
@@ -1,23 +1,43 @@
-from collections import defaultdict
-from datetime import datetime, timedelta
+import hashlib
+import re
+from datetime import datetime
 from datetime import timezone as dt_timezone
-from django.utils import timezone as dj_timezone
-from kanjilearner.constants import EntryType, SRSStage
-from kanjilearner.pagination import SearchPagination
+from kanjilearner.constants import NOT_IN_REVIEWS, SRSStage
+from kanjilearner.pagination import SearchCursorPagination, SearchPagination
+from kanjilearner.renderers import FAST_RENDERER_CLASSES
 from kanjilearner.services.plan import process_planned_entries
-from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.decorators import (
+    api_view, authentication_classes, permission_classes, renderer_classes, throttle_classes,
+)
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
-from kanjilearner.models import DictionaryEntry, PlannedEntry, RecentMistake, UserDictionaryEntry
-from kanjilearner.serializers import UserDictionaryEntrySerializer
+from kanjilearner.models import PlannedEntry, RecentMistake, UserDictionaryEntry, UserQueueCounts
+from kanjilearner.serializers import (
+    DictionaryEntrySerializer, ReviewCardSerializer, ReviewResultSerializer, UserDictionaryEntrySerializer,
+)
 from kanjilearner.services.plan import plan_entry
+from kanjilearner.services.loaders import USER_ENTRY_FIELDS, load_user_entries
+from kanjilearner.services import review_sessions
+from kanjilearner.services.dashboard import cached_item_spread, cached_review_forecast, dashboard_summary
+from kanjilearner.services.reviews import apply_review_results
+from kanjilearner.services.search import search_entries
+from kanjilearner.services.srs import apply_review
+from kanjilearner.services.catalog import get_catalog, get_loaded_catalog, get_request_catalog
+from kanjilearner.services.user_state import get_user_state_stamp, stamp_to_datetime
 from zoneinfo import ZoneInfo
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.tokens import default_token_generator
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.db.models import Q
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from functools import wraps
+from django.db.models import Case, When
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.middleware.csrf import get_token
+from django.http import HttpResponse
 from django.core.mail import send_mail
 from django.contrib.auth.models import User
 from django.conf import settings
@@ -140,35 +160,52 @@ def delete_account(request):
     return Response({"message": f"Account '{username}' and all related data deleted."})
 
 
+def user_entries_data(request, udes):
+    """
+    Serialize a UDE queryset in full, or as compact review cards with ?view=card.
+    Either way only the UDE columns the serializer reads are loaded.
+    """
+    if request.query_params.get("view") == "card":
+        udes = udes.only(*ReviewCardSerializer.Meta.fields)
+        context = {"catalog": get_request_catalog(request)}
+        return ReviewCardSerializer(udes, many=True, context=context).data
+
+    udes, context = load_user_entries(request.user, udes.only(*USER_ENTRY_FIELDS))
+    serializer = UserDictionaryEntrySerializer(udes, many=True, context=context)
+    return serializer.data
+
+
+def user_entries_response(request, udes):
+    return Response(user_entries_data(request, udes))
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_lessons(request):
     """
     Return lessons for the user that have been unlocked but not yet started (srs_stage == LESSON).
-    Supports ?limit=... query param.
+    Supports ?limit=... and ?view=card (compact cards) query params.
     """
     limit = int(request.query_params.get("limit", 100))
 
     udes = (
         UserDictionaryEntry.objects
         .filter(user=request.user, srs_stage=SRSStage.LESSON)
-        .select_related("entry")
-        .order_by("entry__level")[:limit]
+        .order_by("entry__level")
     )
-
-    serializer = UserDictionaryEntrySerializer(udes, many=True)
-    return Response(serializer.data)
+    return user_entries_response(request, udes[:limit])
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
 def get_reviews(request):
     """
     Return reviewable UserDictionaryEntries:
     - Unlocked (not LOCKED)
     - Not in LESSON stage
     - Due for review (next_review_at <= now)
-    Supports ?limit=... query param.
+    Supports ?limit=... and ?view=card (compact cards) query params.
     """
     limit = int(request.query_params.get("limit", 100))
     now = datetime.now(dt_timezone.utc)
@@ -176,16 +213,25 @@ def get_reviews(request):
     udes = (
         UserDictionaryEntry.objects
         .filter(user=request.user)
-        .exclude(srs_stage__in=[SRSStage.LOCKED, SRSStage.LESSON])
+        .exclude(srs_stage__in=NOT_IN_REVIEWS)
         .filter(next_review_at__lte=now)
-        .select_related("entry")
-        .order_by("entry__level")[:limit]
+        .order_by("entry__level")
     )
+    return user_entries_response(request, udes[:limit])
 
-    serializer = UserDictionaryEntrySerializer(udes, many=True)
-    return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_queue_counts(request):
+    """
+    Badge counts for the dashboard, from the user's UserQueueCounts row
+    (one primary-key lookup; no UDEs are read):
+        {"lessons": <int>, "reviews": <int>, "next_review_at": <datetime or null>}
+    next_review_at is when the next reviews come due, if none are due yet.
+    """
+    return Response(UserQueueCounts.for_user(request.user.id).summary())
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -194,25 +240,17 @@ def get_recent_mistakes(request):
     Return up to 50 recent mistakes from the past 24 hours for the user.
     These are pre-tracked in the RecentMistake table.
     """
-    now = datetime.now(dt_timezone.utc)
-    cutoff = now - timedelta(hours=24)
-
-    # Purge old mistakes beyond 24h so they don’t linger in DB
-    RecentMistake.objects.filter(user=request.user, timestamp__lt=cutoff).delete()
-
-    recent_mistakes = (
-        RecentMistake.objects
-        .filter(user=request.user, timestamp__gte=cutoff)
-        .order_by('-timestamp')[:50]
-    )
+    # Older rows are left in place (at most MAX_PER_USER per user) and filtered out here
+    recent_mistakes = RecentMistake.recent(request.user)[:RecentMistake.MAX_PER_USER]
 
     # Map mistakes back into UDEs
-    udes = [
-        UserDictionaryEntry.objects.get_or_create(user=request.user, entry=rm.entry)[0]
-        for rm in recent_mistakes
-    ]
+    catalog = get_catalog()
+    udes = UserDictionaryEntry.bulk_get_or_create(
+        request.user, catalog.related(rm.entry_id for rm in recent_mistakes)
+    )
 
-    serializer = UserDictionaryEntrySerializer(udes, many=True)
+    udes, context = load_user_entries(request.user, udes, catalog)
+    serializer = UserDictionaryEntrySerializer(udes, many=True, context=context)
     return Response(serializer.data)
 
 
@@ -224,166 +262,521 @@ def result_success(request):
     Mark a review as successful and promote the corresponding SRS stage.
     Payload:
         {
-            "entry_id": <int>
+            "entry_id": <int>,
+            "latency_ms": <int>   // optional, time taken to answer
         }
     """
+    return review_result_response(request, correct=True)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def result_failure(request):
+    """
+    Mark a review as failed and demote the corresponding SRS stage.
+    Also appends to RecentMistake.
+    Payload:
+        {
+            "entry_id": <int>,
+            "latency_ms": <int>   // optional, time taken to answer
+        }
+    """
+    return review_result_response(request, correct=False)
+
+
+def review_result_response(request, correct):
+    """
+    Shared by result_success / result_failure. The stage change is a single
+    UPDATE ... RETURNING (services/srs.py), so answers from two tabs can't
+    overwrite each other; the answer is logged as a ReviewEvent.
+    """
     entry_id = request.data.get("entry_id")
     if entry_id is None:
         return Response({"error": "Missing entry_id"}, status=400)
 
-    try:
-        entry = DictionaryEntry.objects.get(id=entry_id)
-        user_entry = UserDictionaryEntry.objects.get(user=request.user, entry=entry)
-    except (DictionaryEntry.DoesNotExist, UserDictionaryEntry.DoesNotExist):
+    entry = get_request_catalog(request).get(entry_id)
+    if entry is None:
         return Response({"error": "Entry not found or not unlocked."}, status=404)
 
-    RecentMistake.clear_for_entry(request.user, entry)
-
-    user_entry.promote()
+    # Validated as result_batch validates each answer
+    answer = {"entry_id": entry.id, "correct": correct}
+    if request.data.get("latency_ms") is not None:
+        answer["latency_ms"] = request.data["latency_ms"]
+    serializer = ReviewResultSerializer(data=answer)
+    if not serializer.is_valid():
+        return Response({"error": serializer.errors}, status=400)
+    latency_ms = serializer.validated_data.get("latency_ms")
+
+    row = apply_review(request.user, entry.id, correct, latency_ms=latency_ms)
+    if row is None:
+        return Response({"error": "Entry not found or not unlocked."}, status=404)
+    new_stage, next_review_at = row
 
-    process_planned_entries(request.user)
+    if correct:
+        RecentMistake.clear_for_entry(request.user, entry.id)
+        process_planned_entries(request.user)
+    else:
+        RecentMistake.record_many(request.user, [entry.id])
 
     return Response({
-        "message": f"{entry.literal} promoted",
-        "new_stage": user_entry.srs_stage,
-        "next_review_at": user_entry.next_review_at,
+        "message": f"{entry.literal} {'promoted' if correct else 'demoted'}",
+        "new_stage": new_stage,
+        "next_review_at": next_review_at,
     })
 
 
+MAX_REVIEW_BATCH = 500
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def result_failure(request):
+def result_batch(request):
     """
-    Mark a review as failed and demote the corresponding SRS stage.
-    Also appends to RecentMistake.
+    Submit many review answers at once; same effects as result_success /
+    result_failure per item, in one transaction.
     Payload:
         {
-            "entry_id": <int>
+            "results": [
+                {"entry_id": <int>, "correct": <bool>, "answered_at": <ISO datetime, optional>,
+                 "latency_ms": <int, optional>},
+                ...
+            ]
         }
     """
-    entry_id = request.data.get("entry_id")
-    if entry_id is None:
-        return Response({"error": "Missing entry_id"}, status=400)
+    results = request.data.get("results") if isinstance(request.data, dict) else None
+    serializer = ReviewResultSerializer(
+        data=results, many=True, allow_empty=False, max_length=MAX_REVIEW_BATCH
+    )
+    if not serializer.is_valid():
+        return Response({"error": serializer.errors}, status=400)
+
+    outcomes, errors = apply_review_results(request.user, serializer.validated_data)
+    return Response({"results": outcomes, "errors": errors})
 
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_review_session(request):
+    """
+    Snapshot the user's due reviews into a server-side session
+    (services/review_sessions.py), to be fetched with review_session_items.
+    Payload (all optional):
+        {
+            "size": <int>,      // default 100, max 500
+            "order": "level" | "due" | "random"   // default "level", as get_reviews
+        }
+    Returns {"session_id": <str>, "total": <reviews in the session>}.
+    """
     try:
-        entry = DictionaryEntry.objects.get(id=entry_id)
-        user_entry = UserDictionaryEntry.objects.get(user=request.user, entry=entry)
-    except (DictionaryEntry.DoesNotExist, UserDictionaryEntry.DoesNotExist):
-        return Response({"error": "Entry not found or not unlocked."}, status=404)
+        size = int(request.data.get("size", 100))
+    except (TypeError, ValueError):
+        return Response({"error": "'size' must be an integer"}, status=400)
+    size = max(1, min(size, review_sessions.MAX_SESSION_SIZE))
+
+    ordering = request.data.get("order", "level")
+    if ordering not in review_sessions.ORDERINGS:
+        return Response({"error": f"Unknown order: {ordering}"}, status=400)
+
+    session_id, session = review_sessions.start_session(request.user, size, ordering)
+    return Response({"session_id": session_id, "total": len(session["entry_ids"])})
 
-    user_entry.demote()
-    UserDictionaryEntry.record_recent_mistake(user=request.user, entry=entry)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
+def review_session_items(request, session_id):
+    """
+    Next chunk of a review session: the first ?limit=... (default 10)
+    reviews not answered through review_session_results yet, in session order.
+    Supports ?view=card like get_reviews. Reads only the chunk's UDEs.
+    """
+    session = review_sessions.get_session(request.user, session_id)
+    if session is None:
+        return Response({"error": "Review session not found or expired"}, status=404)
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 10)), review_sessions.MAX_SESSION_SIZE))
+    except ValueError:
+        return Response({"error": "Invalid 'limit' parameter"}, status=400)
+
+    chunk = review_sessions.next_chunk(session, limit)
+    items = []
+    if chunk:
+        in_session_order = Case(*[When(entry_id=entry_id, then=i) for i, entry_id in enumerate(chunk)])
+        udes = (
+            UserDictionaryEntry.objects
+            .filter(user=request.user, entry_id__in=chunk)
+            .order_by(in_session_order)
+        )
+        items = user_entries_data(request, udes)
 
     return Response({
-        "message": f"{entry.literal} demoted",
-        "new_stage": user_entry.srs_stage,
-        "next_review_at": user_entry.next_review_at,
+        "session_id": session_id,
+        "total": len(session["entry_ids"]),
+        "remaining": review_sessions.remaining(session),
+        "items": items,
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def review_session_results(request, session_id):
+    """
+    Submit answers for reviews in a session; same payload and effects as
+    result_batch. Answers for entries outside the session, or already
+    answered in it (a retried post), are reported in "errors"; answered
+    entries are left out of later chunks. Posts to one session are applied
+    one at a time: a post made while another is in progress gets a 409.
+    """
+    if review_sessions.get_session(request.user, session_id) is None:
+        return Response({"error": "Review session not found or expired"}, status=404)
+
+    results = request.data.get("results") if isinstance(request.data, dict) else None
+    serializer = ReviewResultSerializer(
+        data=results, many=True, allow_empty=False, max_length=MAX_REVIEW_BATCH
+    )
+    if not serializer.is_valid():
+        return Response({"error": serializer.errors}, status=400)
+
+    with review_sessions.session_lock(session_id) as locked:
+        if not locked:
+            return Response({"error": "Answers for this session are already being submitted"}, status=409)
+        # Re-read under the lock, to see answers a post before this one recorded
+        session = review_sessions.get_session(request.user, session_id)
+        if session is None:
+            return Response({"error": "Review session not found or expired"}, status=404)
+
+        in_session = set(session["entry_ids"])
+        answered = set(session["answered"])
+        errors = []
+        results = []
+        for result in serializer.validated_data:
+            if result["entry_id"] not in in_session:
+                errors.append({"entry_id": result["entry_id"], "error": "Entry not in this review session."})
+            elif result["entry_id"] in answered:
+                errors.append({"entry_id": result["entry_id"], "error": "Entry already answered in this review session."})
+            else:
+                results.append(result)
+
+        outcomes = []
+        if results:
+            outcomes, apply_errors = apply_review_results(request.user, results)
+            errors += apply_errors
+            review_sessions.record_answers(session_id, session, [outcome["entry_id"] for outcome in outcomes])
+
+    return Response({
+        "results": outcomes,
+        "errors": errors,
+        "remaining": review_sessions.remaining(session),
+    })
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
 def get_review_forecast(request):
     """
     Return upcoming reviews for the next 7 days,
     bucketed by local date (YYYY-MM-DD) and hour (00-23).
     Counts include a global cumulative total that rolls forward across all days.
     Always includes all 7 days and 24 hours, even if count=0.
+    Bucketed in SQL and cached for the rest of the hour (services/dashboard.py).
     """
+    user_tz, error = user_timezone(request)
+    if error:
+        return error
+    return Response(cached_review_forecast(request.user, user_tz))
+
+
+def user_timezone(request):
+    """(ZoneInfo for ?tz=, None), or (None, 400 response) if it's missing or unknown."""
     user_tz_str = request.query_params.get("tz")  # e.g. "America/Los_Angeles"
     if not user_tz_str:
-        return Response({"error": "Missing 'tz' timezone parameter"}, status=400)
+        return None, Response({"error": "Missing 'tz' timezone parameter"}, status=400)
 
     try:
-        user_tz = ZoneInfo(user_tz_str)
+        return ZoneInfo(user_tz_str), None
     except Exception:
-        return Response({"error": f"Unknown timezone: {user_tz_str}"}, status=400)
+        return None, Response({"error": f"Unknown timezone: {user_tz_str}"}, status=400)
 
-    now_utc = dj_timezone.now()
-    now_local = now_utc.astimezone(user_tz)
 
-    # Range: now → 7 days from now (local 23:59:59)
-    local_end = (now_local + timedelta(days=7)).replace(
-        hour=23, minute=59, second=59, microsecond=0
-    )
-    utc_start = now_local.astimezone(dt_timezone.utc)
-    utc_end = local_end.astimezone(dt_timezone.utc)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
+def get_dashboard(request):
+    """
+    Everything the landing page needs, from the cached or aggregate data the
+    individual endpoints use, read in one read-only transaction
+    (services/dashboard.py); no entries are serialized.
+    Requires ?tz=... for the forecast, as get_review_forecast.
+        {
+          "lessons": <int>,            // as get_queue_counts
+          "reviews": <int>,            // due now, as get_queue_counts
+          "forecast": {...},           // as get_review_forecast
+          "item_spread": {...},        // as get_item_spread
+          "recent_mistakes": <int>     // mistakes in the last 24 hours
+        }
+    """
+    user_tz, error = user_timezone(request)
+    if error:
+        return error
+    return Response(dashboard_summary(request.user, user_tz))
+
+
+def search_etag(request):
+    """
+    Catalog content + query params + Accept (JSON and MessagePack bodies differ)
+    + the user's state stamp; no search or user-state queries.
+    """
+    if not request.user.is_authenticated or not request.GET.get("q", "").strip():
+        return None
+    params = sorted(request.GET.lists())
+    accept = request.headers.get("Accept", "")
+    content_hash = get_request_catalog(request).content_hash
+    digest = hashlib.sha256(f"{content_hash}|{params}|{accept}".encode()).hexdigest()[:32]
+    return f'"{digest}-{get_user_state_stamp(request.user.id)}"'
 
-    # Get reviews due in this 7-day window
-    upcoming_reviews = (
-        UserDictionaryEntry.objects
-        .filter(user=request.user)
-        .exclude(srs_stage__in=[SRSStage.LOCKED, SRSStage.LESSON, SRSStage.BURNED])
-        .filter(next_review_at__gt=utc_start, next_review_at__lte=utc_end)
-        .values_list("next_review_at", flat=True)
-    )
 
-    # Bucket counts by (day, hour)
-    raw_buckets = defaultdict(lambda: defaultdict(int))
-    for dt in upcoming_reviews:
-        local_dt = dt.astimezone(user_tz)
-        day_str = local_dt.strftime("%Y-%m-%d")
-        hour_str = f"{local_dt.hour:02d}"
-        raw_buckets[day_str][hour_str] += 1
-
-    # Build result: always 7 days × 24 hours
-    result = {}
-    cumulative = 0
-    for offset in range(7):
-        day = (now_local + timedelta(days=offset)).date()
-        day_str = day.strftime("%Y-%m-%d")
-        result[day_str] = {}
-        for hour in [f"{h:02d}" for h in range(24)]:
-            count = raw_buckets.get(day_str, {}).get(hour, 0)
-            cumulative += count
-            result[day_str][hour] = {"count": count, "cumulative": cumulative}
-
-    return Response(result)
+def search_last_modified(request):
+    if not request.user.is_authenticated:
+        return None
+    stamp = stamp_to_datetime(get_user_state_stamp(request.user.id))
+    return max(get_request_catalog(request).updated_at, stamp)
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Tag the response with validators computed after the view ran: it may have
+    created UDEs (bumping the user's stamp) after condition() computed its own.
+    """
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def cache_successful(**cache_kwargs):
+    """
+    cache_control for 200 / 304 responses only; anything else (a 404, or a
+    401 / 403 from DRF's authentication) is marked no-store so shared caches
+    don't keep it. Put above @api_view, so it sees DRF's error responses too.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                patch_cache_control(response, **cache_kwargs)
+            else:
+                patch_cache_control(response, no_store=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    A 304 if the request's If-None-Match / If-Modified-Since still match,
+    else None. For public views behind authentication: condition() runs
+    before DRF authenticates, so it would answer anonymous clients too.
+    """
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
 
 
+# Results include the user's SRS state: browsers may keep them, but must revalidate
+@cache_control(private=True, no_cache=True)
+@vary_on_headers("Accept")
+@condition(etag_func=search_etag, last_modified_func=search_last_modified)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
 def search(request):
     """
     Search DictionaryEntry by kanji, kana reading, or meaning.
-    Supports ?q=<query>&page=<n>&page_size=<m>.
+    Supports ?q=<query>&page=<n>&page_size=<m>,
+    or keyset pages with ?q=<query>&cursor=<cursor>&page_size=<m>[&total=1].
     """
     query = request.query_params.get("q", "").strip()
     if not query:
         return Response({"error": "Missing 'q' parameter"}, status=400)
 
-    qs = DictionaryEntry.objects.filter(
-        Q(literal__icontains=query) |
-        Q(meaning__icontains=query) |
-        Q(kunyomi_readings__icontains=query) |
-        Q(onyomi_readings__icontains=query) |
-        Q(reading__icontains=query)
-    ).order_by("level", "id")
+    catalog = get_request_catalog(request)
 
-    paginator = SearchPagination()
-    page = paginator.paginate_queryset(qs, request)
+    if SearchCursorPagination.cursor_query_param in request.query_params:
+        # Keyset pages walk the in-memory catalog in (level, id) order
+        paginator = SearchCursorPagination()
+        page = paginator.paginate_catalog_search(catalog, query, request)
+    else:
+        # Matches from settings.SEARCH_BACKEND (services/search.py)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(search_entries(catalog, query), request)
 
     # Map results into UDEs (create if needed)
-    udes = [
-        UserDictionaryEntry.objects.get_or_create(user=request.user, entry=e)[0]
-        for e in page
-    ]
+    udes = UserDictionaryEntry.bulk_get_or_create(request.user, page)
+
+    udes, context = load_user_entries(request.user, udes, catalog)
+    serializer = UserDictionaryEntrySerializer(udes, many=True, context=context)
+    response = paginator.get_paginated_response(serializer.data)
+    return set_validators(response, search_etag(request), search_last_modified(request))
+
 
-    serializer = UserDictionaryEntrySerializer(udes, many=True)
-    return paginator.get_paginated_response(serializer.data)
+TYPEAHEAD_MAX_LIMIT = 25
 
 
+# Catalog-only and user-independent: no authentication, so no session/user queries
+@cache_control(public=True, max_age=60)
 @api_view(['GET'])
-def entry_detail(request, pk):
+@authentication_classes([])
+@permission_classes([AllowAny])
+def typeahead(request):
+    """
+    Autocomplete for the search box: entries whose literal, reading or meaning
+    starts with ?q=, from the in-memory catalog (no database access).
+    Supports ?limit=<n> (default 10, max 25).
+    """
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return Response({"error": "Missing 'q' parameter"}, status=400)
     try:
-        entry = DictionaryEntry.objects.get(pk=pk)
-    except DictionaryEntry.DoesNotExist:
+        limit = max(1, min(int(request.query_params.get("limit", 10)), TYPEAHEAD_MAX_LIMIT))
+    except ValueError:
+        return Response({"error": "Invalid 'limit' parameter"}, status=400)
+
+    entries = get_loaded_catalog().typeahead.complete(query, limit)
+    return Response({"results": [{"id": e.id, "literal": e.literal} for e in entries]})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def kanji_by_radicals(request):
+    """
+    Kanji containing all the given radicals: ?radicals=<id>,<id>,...
+    Answered from in-memory bitsets (services/radicals.py); "available_radicals"
+    lists the radicals that would still match something if added.
+    """
+    raw = request.query_params.get("radicals", "")
+    try:
+        radical_ids = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        return Response({"error": "'radicals' must be comma-separated entry ids"}, status=400)
+    if not radical_ids:
+        return Response({"error": "Missing 'radicals' parameter"}, status=400)
+
+    index = get_request_catalog(request).radical_index
+    unknown = [radical_id for radical_id in radical_ids if radical_id not in index.radical_ids]
+    if unknown:
+        return Response({"error": f"Not radicals: {unknown}"}, status=400)
+
+    bits = index.match(radical_ids)
+    return Response({
+        "radicals": radical_ids,
+        "results": [
+            {"id": k.id, "literal": k.literal, "meaning": k.meaning, "level": k.level}
+            for k in index.kanji_within(bits)
+        ],
+        "available_radicals": index.radicals_within(bits),
+    })
+
+
+def entry_detail_etag(request, pk):
+    if not request.user.is_authenticated:
+        return None
+    catalog = get_request_catalog(request)
+    if catalog.get(pk) is None:
+        return None
+    return f'"{catalog.entry_hash(pk)}-{get_user_state_stamp(request.user.id)}"'
+
+
+def entry_detail_last_modified(request, pk):
+    if not request.user.is_authenticated:
+        return None
+    stamp = stamp_to_datetime(get_user_state_stamp(request.user.id))
+    return max(get_request_catalog(request).updated_at, stamp)
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=entry_detail_etag, last_modified_func=entry_detail_last_modified)
+@api_view(['GET'])
+def entry_detail(request, pk):
+    catalog = get_request_catalog(request)
+    entry = catalog.get(pk)
+    if entry is None:
         return Response({"error": "Not found"}, status=404)
 
-    ude, _ = UserDictionaryEntry.objects.get_or_create(user=request.user, entry=entry)
-    serializer = UserDictionaryEntrySerializer(ude)
-    return Response(serializer.data)
+    udes = UserDictionaryEntry.bulk_get_or_create(request.user, [entry])
+
+    udes, context = load_user_entries(request.user, udes, catalog)
+    serializer = UserDictionaryEntrySerializer(udes[0], context=context)
+    return set_validators(
+        Response(serializer.data),
+        entry_detail_etag(request, pk),
+        entry_detail_last_modified(request, pk),
+    )
+
+
+# Same for every user, so caches may keep it for a while
+@cache_successful(public=True, max_age=300)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def entry_catalog(request, pk):
+    """
+    Catalog-only view of an entry: same shape as entry_detail's "entry",
+    without any user state (srs_stage etc. are null).
+    """
+    catalog = get_request_catalog(request)
+    entry = catalog.get(pk)
+    if entry is None:
+        return Response({"error": "Not found"}, status=404)
+
+    etag = f'"{catalog.entry_hash(pk)}"'
+    response = not_modified(request, etag, catalog.updated_at)
+    if response is None:
+        serializer = DictionaryEntrySerializer(entry, context={"catalog": catalog})
+        response = Response(serializer.data)
+    return set_validators(response, etag, catalog.updated_at)
+
+
+ACCEPTS_GZIP_RE = re.compile(r"\bgzip\b")
+
+
+def catalog_snapshot_response(request, catalog):
+    """The snapshot, or a 304 if the client already has this version."""
+    etag = f'"{catalog.content_hash}"'
+    response = not_modified(request, etag)
+    if response is None:
+        snapshot = catalog.snapshot
+        if ACCEPTS_GZIP_RE.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            response = HttpResponse(snapshot.gzipped, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(snapshot.body, content_type="application/json")
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    return response
+
+
+@cache_successful(public=True, max_age=300)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def catalog_snapshot(request):
+    """
+    Return the whole DictionaryEntry catalog for client-side caching:
+        {"version": "<content hash>", "entries": [{..., "constituents": [ids], ...}]}
+    Precomputed once per catalog version and served gzipped when accepted.
+    Clients can then pin /api/catalog/snapshot/<version>/, which never changes.
+    """
+    return catalog_snapshot_response(request, get_request_catalog(request))
+
+
+@cache_successful(public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def catalog_snapshot_version(request, version):
+    """Snapshot pinned to a content hash; only the current one is kept."""
+    catalog = get_request_catalog(request)
+    if version != catalog.content_hash:
+        return Response({"error": "Unknown catalog version"}, status=404)
+    return catalog_snapshot_response(request, catalog)
 
 
 @api_view(['POST'])
@@ -393,26 +786,26 @@ def plan_add(request):
     if not entry_id:
         return Response({"error": "Missing entry_id"}, status=400)
 
-    try:
-        entry = DictionaryEntry.objects.get(id=entry_id)
-    except DictionaryEntry.DoesNotExist:
+    catalog = get_catalog()
+    entry = catalog.get(entry_id)
+    if entry is None:
         return Response({"error": "Entry not found"}, status=404)
 
-    plan_entry(request.user, entry)
+    plan_entry(request.user, entry, catalog)
     return Response({"message": f"{entry.literal} planned"})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_planned(request):
-    planned = PlannedEntry.objects.filter(user=request.user).select_related("entry")
+    planned = PlannedEntry.objects.filter(user=request.user).values_list("entry_id", flat=True)
 
     # Convert planned entries into UDEs for this user
-    udes = [
-        UserDictionaryEntry.objects.get_or_create(user=request.user, entry=p.entry)[0] for p in planned
-    ]
+    catalog = get_catalog()
+    udes = UserDictionaryEntry.bulk_get_or_create(request.user, catalog.related(planned))
 
-    serializer = UserDictionaryEntrySerializer(udes, many=True)
+    udes, context = load_user_entries(request.user, udes, catalog)
+    serializer = UserDictionaryEntrySerializer(udes, many=True, context=context)
     return Response(serializer.data)
 
 
@@ -431,51 +824,7 @@ def get_item_spread(request):
           "enlightened": {"radicals": 82, "kanji": 358, "vocab": 1285},
           "burned": {"radicals": 273, "kanji": 477, "vocab": 1448}
         }
+    Counted with one GROUP BY and cached per user until one of their stages
+    changes (services/dashboard.py).
     """
-
-    user = request.user
-
-    STAGE_GROUPS = {
-        "apprentice": {
-            SRSStage.APPRENTICE_1,
-            SRSStage.APPRENTICE_2,
-            SRSStage.APPRENTICE_3,
-            SRSStage.APPRENTICE_4,
-        },
-        "guru": {
-            SRSStage.GURU_1,
-            SRSStage.GURU_2,
-        },
-        "master": {SRSStage.MASTER},
-        "enlightened": {SRSStage.ENLIGHTENED},
-        "burned": {SRSStage.BURNED},
-    }
-
-    # Initialize tallies
-    results = {
-        group: {"radicals": 0, "kanji": 0, "vocab": 0}
-        for group in STAGE_GROUPS
-    }
-
-    # Query user's entries
-    entries = (
-        UserDictionaryEntry.objects
-        .filter(user=user)
-        .select_related("entry")
-        .only("srs_stage", "entry__entry_type")
-    )
-
-    # Tally per group and entry type
-    for ude in entries:
-        for group, stages in STAGE_GROUPS.items():
-            if ude.srs_stage in stages:
-                etype = ude.entry.entry_type
-                if etype == EntryType.RADICAL:
-                    results[group]["radicals"] += 1
-                elif etype == EntryType.KANJI:
-                    results[group]["kanji"] += 1
-                elif etype == EntryType.VOCAB:
-                    results[group]["vocab"] += 1
-                break
-
-    return Response(results)
+    return Response(cached_item_spread(request.user))
@@ -139,6 +139,35 @@ else:
     }
 
 
+# Cache
+# Holds per-user state stamps for conditional GETs (kanjilearner/services/user_state.py)
+# and review session queues (kanjilearner/services/review_sessions.py).
+# Local memory is per process: fine for the single gunicorn worker in Procfile,
+# but use a shared backend (Redis, database) before running more workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+
+# Search backend for the search view (kanjilearner/services/search.py):
+# "catalog" scans the in-memory catalog; "trigram" uses the pg_trgm GIN indexes
+# (migration 0019 creates the pg_trgm extension, so the database role needs to be
+# allowed to; pg_trgm ships with PostgreSQL contrib).
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "catalog")
+
+
+# Review scheduler (kanjilearner/services/scheduling.py): "hourly" puts every
+# review on the hour; "offset" (a fixed minute per user) and "jitter" (random
+# per review) spread them over the hour, so refreshes don't all land at :00.
+
+REVIEW_SCHEDULER = os.getenv("REVIEW_SCHEDULER", "hourly")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -207,3 +236,12 @@ if ENV == "prod":
     SECURE_HSTS_SECONDS = 31536000  # one year
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
+
+# Django REST framework
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        # Same output as JSONRenderer; splices cached entry JSON instead of re-encoding it
+        "kanjilearner.renderers.PrerenderedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 
 application = get_wsgi_application()
+
+# Load this worker's catalog (and search index) before the first request
+from django.db import DatabaseError
+from kanjilearner.services.search import warm_up
+
+try:
+    warm_up()
+except DatabaseError:
+    pass  # e.g. not migrated yet; it loads on first use instead